@@ -0,0 +1,144 @@
+"""
+Load test for linkedin.gateway.LinkedInGateway against a local stub of the
+LinkedIn API, e.g.:
+
+    python examples/gateway_loadtest.py --clients 50 --requests 2000
+"""
+from __future__ import print_function
+import argparse
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlparse, parse_qs
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlparse, parse_qs
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from linkedin.gateway import LinkedInGateway
+from linkedin.utils import json
+
+
+SEARCH_TOTAL = 120
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class StubLinkedInHandler(BaseHTTPRequestHandler):
+    """ Answers a tiny subset of the LinkedIn API with canned data """
+    protocol_version = 'HTTP/1.1'
+    latency = 0.02
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        if parsed.path.startswith('/v1/people-search'):
+            start = int(query.get('start', ['0'])[0])
+            count = int(query.get('count', ['25'])[0])
+            values = [{'id': 'member-%d' % i, 'firstName': 'Member %d' % i}
+                      for i in range(start, min(start + count, SEARCH_TOTAL))]
+            payload = {'people': {'_start': start, '_count': len(values),
+                                  '_total': SEARCH_TOTAL, 'values': values}}
+        elif parsed.path.startswith('/v1/people'):
+            payload = {'id': 'COjFALsKDP', 'firstName': 'ozgur',
+                       'lastName': 'vatansever', 'headline': 'This is my headline'}
+        else:
+            payload = {'errorCode': 0, 'message': 'Not found', 'status': 404}
+        body = json.dumps(payload).encode('utf8')
+        self.send_response(200 if 'errorCode' not in payload else 404)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RedirectingAdapter(HTTPAdapter):
+    """ Sends requests meant for api.linkedin.com to the stub instead """
+
+    def __init__(self, upstream, **kwargs):
+        self.upstream = upstream
+        super(RedirectingAdapter, self).__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        request.url = request.url.replace('https://api.linkedin.com', self.upstream)
+        return super(RedirectingAdapter, self).send(request, **kwargs)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--tokens', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=32)
+    args = parser.parse_args()
+
+    stub = ThreadingHTTPServer(('127.0.0.1', 0), StubLinkedInHandler)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+
+    session = requests.Session()
+    session.mount('https://', RedirectingAdapter('http://127.0.0.1:%d' % stub.server_address[1],
+                                                 pool_maxsize=args.workers))
+    gateway = LinkedInGateway(session=session, max_workers=args.workers)
+    gateway.start(host='127.0.0.1', port=0)
+    base = 'http://127.0.0.1:%d' % gateway.server_address[1]
+
+    paths = ['/get_profile', '/get_profile?selectors=id,first-name',
+             '/search_profile?keywords=python', '/search_profile?stream=1&keywords=python']
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    counter = iter(range(args.requests))
+
+    def client():
+        http = requests.Session()
+        for i in counter:
+            path = paths[i % len(paths)]
+            token = 'token-%d' % (i % args.tokens)
+            started = time.time()
+            response = http.get(base + path,
+                                headers={'Authorization': 'Bearer %s' % token})
+            elapsed = time.time() - started
+            with lock:
+                latencies.append(elapsed)
+                if response.status_code != 200:
+                    errors[0] += 1
+
+    started = time.time()
+    threads = [threading.Thread(target=client) for _ in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.time() - started
+
+    print('requests: %d in %.2fs (%.0f req/s), errors: %d' % (
+        len(latencies), duration, len(latencies) / duration, errors[0]))
+    print('latency p50: %.1fms p95: %.1fms p99: %.1fms' % (
+        percentile(latencies, 0.5) * 1000, percentile(latencies, 0.95) * 1000,
+        percentile(latencies, 0.99) * 1000))
+    print('gateway: %s' % gateway.metrics.snapshot())
+    print('upstream: %s' % gateway.upstream_metrics.snapshot())
+    gateway.shutdown()
+    stub.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+import collections
+import threading
+import time
+
+from .exceptions import LinkedInCircuitOpenError
+from .utils import enum
+
+
+__all__ = ['CircuitBreaker', 'CircuitBreakerRegistry', 'CIRCUIT_STATES']
+
+CIRCUIT_STATES = enum('CircuitState', CLOSED='closed', OPEN='open',
+                      HALF_OPEN='half-open')
+
+
+class CircuitBreaker(object):
+    """
+    Fails calls to a degraded endpoint fast instead of letting them block.
+
+    The breaker opens once at least ``min_calls`` of the last ``window`` calls
+    were made and ``failure_threshold`` of them failed; calls slower than
+    ``slow_call_threshold`` seconds count as failures. After
+    ``reset_timeout`` seconds it lets ``half_open_calls`` probe calls through
+    and closes again if all of them succeed.
+    """
+
+    def __init__(self, name, failure_threshold=0.5, window=20, min_calls=10,
+                 slow_call_threshold=None, reset_timeout=30, half_open_calls=1,
+                 clock=time.time):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.slow_call_threshold = slow_call_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.clock = clock
+        self.state = CIRCUIT_STATES.CLOSED
+        self.opened_at = None
+        self.rejected = 0
+        self._outcomes = collections.deque(maxlen=window)
+        self._probes = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def failure_rate(self):
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return float(self._outcomes.count(False)) / len(self._outcomes)
+
+    def before_call(self):
+        """
+        Raises LinkedInCircuitOpenError if the call must not be made.
+        """
+        with self._lock:
+            if self.state == CIRCUIT_STATES.OPEN:
+                if self.clock() - self.opened_at < self.reset_timeout:
+                    self.rejected += 1
+                    raise LinkedInCircuitOpenError(
+                        'Circuit for %s is open' % self.name)
+                self.state = CIRCUIT_STATES.HALF_OPEN
+                self._probes = 0
+                self._probe_successes = 0
+            if self.state == CIRCUIT_STATES.HALF_OPEN:
+                if self._probes >= self.half_open_calls:
+                    self.rejected += 1
+                    raise LinkedInCircuitOpenError(
+                        'Circuit for %s is half-open and probing' % self.name)
+                self._probes += 1
+
+    def record(self, success, duration=None):
+        if (success and duration is not None and
+                self.slow_call_threshold is not None and
+                duration > self.slow_call_threshold):
+            success = False
+        with self._lock:
+            if self.state == CIRCUIT_STATES.HALF_OPEN:
+                if not success:
+                    self._open()
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_calls:
+                        self.state = CIRCUIT_STATES.CLOSED
+                        self._outcomes.clear()
+                return
+            if self.state == CIRCUIT_STATES.OPEN:
+                return
+            self._outcomes.append(success)
+            if len(self._outcomes) >= self.min_calls:
+                failures = self._outcomes.count(False)
+                if float(failures) / len(self._outcomes) >= self.failure_threshold:
+                    self._open()
+
+    def release(self):
+        """
+        Ends a call allowed by ``before_call`` without recording an outcome,
+        e.g. when it failed before reaching the endpoint.
+        """
+        with self._lock:
+            if self.state == CIRCUIT_STATES.HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def _open(self):
+        self.state = CIRCUIT_STATES.OPEN
+        self.opened_at = self.clock()
+        self._outcomes.clear()
+
+
+class CircuitBreakerRegistry(object):
+    """
+    Hands out one CircuitBreaker per logical endpoint (``people``,
+    ``companies``, ``people-search``, ...). Keyword arguments are used as
+    defaults for new breakers; ``overrides`` maps endpoint names to their own
+    settings. Breaker states are published as ``circuit.<endpoint>.state``
+    gauges on every attached LinkedInMetrics.
+    """
+
+    def __init__(self, overrides=None, **defaults):
+        self.defaults = defaults
+        self.overrides = overrides or {}
+        self._breakers = {}
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        breaker = self._breakers.get(name)
+        if breaker is not None:
+            return breaker
+        with self._lock:
+            if name not in self._breakers:
+                options = dict(self.defaults, **self.overrides.get(name, {}))
+                breaker = self._breakers[name] = CircuitBreaker(name, **options)
+                for metrics in self._metrics:
+                    self._publish(metrics, breaker)
+            return self._breakers[name]
+
+    def attach(self, metrics):
+        with self._lock:
+            self._metrics.append(metrics)
+            for breaker in self._breakers.values():
+                self._publish(metrics, breaker)
+
+    def _publish(self, metrics, breaker):
+        prefix = 'circuit.%s.' % breaker.name
+        metrics.gauge(prefix + 'state', lambda: breaker.state)
+        metrics.gauge(prefix + 'failure_rate', lambda: breaker.failure_rate)
+        metrics.gauge(prefix + 'rejected', lambda: breaker.rejected)
+
+    @property
+    def states(self):
+        return dict((name, breaker.state)
+                    for name, breaker in list(self._breakers.items()))
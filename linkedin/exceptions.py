@@ -12,6 +12,10 @@ class LinkedInUnauthorizedError(LinkedInError):
     pass
 
 
+class LinkedInTokenExpiredError(LinkedInUnauthorizedError):
+    pass
+
+
 class LinkedInPaymentRequiredError(LinkedInError):
     pass
 
@@ -32,6 +36,18 @@ class LinkedInInternalServiceError(LinkedInError):
     pass
 
 
+class LinkedInCircuitOpenError(LinkedInError):
+    pass
+
+
+class LinkedInDeadlineExceededError(LinkedInError):
+    pass
+
+
+class LinkedInAuthorizationError(LinkedInError):
+    pass
+
+
 ERROR_CODE_EXCEPTION_MAPPING = {
     400: LinkedInBadRequestError,
     401: LinkedInUnauthorizedError,
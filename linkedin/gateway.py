@@ -0,0 +1,495 @@
+# -*- coding: utf-8 -*-
+import collections
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlparse, parse_qsl
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlparse, parse_qsl
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .exceptions import (LinkedInError, LinkedInBadRequestError,
+                         LinkedInUnauthorizedError, LinkedInTokenExpiredError,
+                         LinkedInPaymentRequiredError, LinkedInForbiddenError,
+                         LinkedInNotFoundError, LinkedInConflictError,
+                         LinkedInInternalServiceError, LinkedInCircuitOpenError,
+                         LinkedInDeadlineExceededError)
+from .linkedin import LinkedInApplication
+from .metrics import LinkedInMetrics
+from .models import RawResponse
+from .utils import json
+
+
+__all__ = ['LinkedInGateway', 'ROUTES', 'PAGINATED_ROUTES']
+
+Route = collections.namedtuple('Route', ['name', 'method', 'args', 'required'])
+
+ENDPOINT_PREFIXES = ('get_', 'search_', 'submit_', 'join_', 'leave_', 'like_',
+                     'comment_', 'follow_', 'unfollow_')
+
+# Arguments given as comma separated values in the query string.
+LIST_ARGS = frozenset(['company_ids', 'universal_names', 'post_ids', 'member_id'])
+BOOLEAN_ARGS = frozenset(['self_scope', 'is_liked'])
+
+PAGINATED_ROUTES = frozenset(['search_profile', 'search_company', 'search_job',
+                              'get_connections', 'get_network_updates',
+                              'get_company_updates', 'get_posts',
+                              'get_post_comments'])
+
+
+def _arguments(func):
+    """
+    Returns the argument names of a method and the names of those without a
+    default value.
+    """
+    func = getattr(func, '__wrapped__', func)
+    func = getattr(func, '__func__', func)
+    code = func.__code__
+    names = code.co_varnames[1:code.co_argcount]
+    return names, names[:len(names) - len(func.__defaults__ or ())]
+
+
+def _build_routes():
+    routes = {}
+    for name in dir(LinkedInApplication):
+        if not name.startswith(ENDPOINT_PREFIXES):
+            continue
+        method = 'GET' if name.startswith(('get_', 'search_')) else 'POST'
+        routes[name] = Route(name, method,
+                             *_arguments(getattr(LinkedInApplication, name)))
+    return routes
+
+ROUTES = _build_routes()
+
+STATUS_FOR_EXCEPTION = {
+    LinkedInBadRequestError: 400,
+    LinkedInUnauthorizedError: 401,
+    LinkedInTokenExpiredError: 401,
+    LinkedInPaymentRequiredError: 402,
+    LinkedInForbiddenError: 403,
+    LinkedInNotFoundError: 404,
+    LinkedInConflictError: 409,
+    LinkedInInternalServiceError: 500,
+    LinkedInCircuitOpenError: 503,
+    LinkedInDeadlineExceededError: 504,
+}
+
+
+def status_for_exception(error):
+    """
+    Returns the gateway status for a LinkedInError, looking up the closest
+    mapped class so that subclasses answer like their parents.
+    """
+    for cls in type(error).__mro__:
+        if cls in STATUS_FOR_EXCEPTION:
+            return STATUS_FOR_EXCEPTION[cls]
+    return 502
+
+
+class _TTLCache(object):
+    def __init__(self, ttl, maxsize):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.time():
+                del self._data[key]
+                return None
+            # Move to the end so that the least recently used entry is evicted.
+            del self._data[key]
+            self._data[key] = item
+            return item[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (time.time() + self.ttl, value)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class _Slots(object):
+    """
+    A counting semaphore whose acquire takes a timeout on every Python
+    version.
+    """
+
+    def __init__(self, size):
+        self._free = size
+        self._condition = threading.Condition()
+
+    def acquire(self, timeout=None):
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while not self._free:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            self._free -= 1
+            return True
+
+    def release(self):
+        with self._condition:
+            self._free += 1
+            self._condition.notify()
+
+
+class _Call(object):
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _SingleFlight(object):
+    """
+    Makes concurrent callers with the same key share a single execution.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = func()
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result, False
+
+
+class GatewayError(Exception):
+    def __init__(self, status, message):
+        super(GatewayError, self).__init__(message)
+        self.status = status
+        self.message = message
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class LinkedInGateway(object):
+    """
+    Exposes LinkedInApplication endpoints over HTTP for other services.
+
+    Callers authenticate with their own LinkedIn access token
+    (``Authorization: Bearer <token>``). Read endpoints are served as
+    ``GET /<endpoint>?<args>`` and are cached for ``cache_ttl`` seconds;
+    identical requests that are in flight at the same time are coalesced
+    into one upstream call. At most ``max_workers`` upstream calls run at
+    once. Paginated endpoints can be streamed page by page with
+    ``stream=1``. Write endpoints take a JSON object of arguments via POST.
+    """
+
+    def __init__(self, session=None, max_workers=32, cache_ttl=30,
+                 cache_size=10000, queue_timeout=5, page_size=25,
+                 max_applications=1024, pool_size=None):
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1,
+                                  pool_maxsize=pool_size or max_workers)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        self.session = session
+        self.queue_timeout = queue_timeout
+        self.page_size = page_size
+        self.max_applications = max_applications
+        self.metrics = LinkedInMetrics()
+        self.upstream_metrics = LinkedInMetrics()
+        self.cache = _TTLCache(cache_ttl, cache_size)
+        self._flight = _SingleFlight()
+        self._workers = _Slots(max_workers)
+        self._applications = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+        self.metrics.gauge('cache_size', lambda: len(self.cache))
+
+    def application_for(self, token):
+        with self._lock:
+            application = self._applications.pop(token, None)
+            if application is None:
+                application = LinkedInApplication(token=token,
+                                                  session=self.session,
+                                                  metrics=self.upstream_metrics)
+            self._applications[token] = application
+            while len(self._applications) > self.max_applications:
+                self._applications.popitem(last=False)
+            return application
+
+    def _call_upstream(self, application, route, kwargs):
+        if not self._workers.acquire(self.queue_timeout):
+            self.metrics.incr('rejected')
+            raise GatewayError(503, 'Too many concurrent upstream requests')
+        try:
+            self.metrics.incr('upstream_calls')
+            return getattr(application, route.name)(**kwargs)
+        finally:
+            self._workers.release()
+
+    def parse_arguments(self, route, query):
+        kwargs = {}
+        params = {}
+        for key, value in query:
+            arg = key.replace('-', '_')
+            if arg in ('params', 'headers'):
+                continue
+            if arg in route.args:
+                if arg in LIST_ARGS and ',' in value:
+                    value = value.split(',')
+                elif arg in LIST_ARGS and arg != 'member_id':
+                    value = [value]
+                elif arg in BOOLEAN_ARGS:
+                    value = value.lower() in ('1', 'true', 'yes')
+                kwargs[arg] = value
+            else:
+                params[key] = value
+        if params and 'params' in route.args:
+            kwargs['params'] = params
+        return kwargs
+
+    def dispatch(self, token, method, path, body=None):
+        """
+        Serves one gateway request and returns ``(status, payload)`` where
+        payload is either a JSON-serializable object, a RawResponse with the
+        upstream body or, for streamed responses, an iterator of byte chunks.
+        """
+        parsed = urlparse(path)
+        name = parsed.path.strip('/')
+        if name == 'routes':
+            return 200, {'routes': sorted(ROUTES)}
+        if name == 'stats':
+            return 200, {'gateway': self.metrics.snapshot(),
+                         'upstream': self.upstream_metrics.snapshot()}
+        route = ROUTES.get(name)
+        if route is None:
+            raise GatewayError(404, 'Unknown route: %s' % name)
+        if route.method != method:
+            raise GatewayError(405, '%s requires %s' % (name, route.method))
+        if not token:
+            raise GatewayError(401, 'Missing bearer token')
+
+        query = sorted(parse_qsl(parsed.query, True))
+        stream = ('stream', '1') in query
+        query = [(k, v) for k, v in query if k != 'stream']
+        application = self.application_for(token)
+
+        if method == 'POST':
+            try:
+                kwargs = json.loads(body or '{}')
+            except ValueError:
+                raise GatewayError(400, 'Request body must be a JSON object')
+            if not isinstance(kwargs, dict) or not set(kwargs) <= set(route.args):
+                raise GatewayError(400, 'Invalid arguments for %s' % name)
+            self._check_required(route, kwargs)
+            return 200, self._call_upstream(application, route, kwargs)
+
+        kwargs = self.parse_arguments(route, query)
+        self._check_required(route, kwargs)
+        if stream and name in PAGINATED_ROUTES:
+            return 200, self._stream_pages(application, route, kwargs)
+
+        key = (token, name, tuple(query))
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.metrics.incr('cache_hits')
+            return cached.status, cached
+        self.metrics.incr('cache_misses')
+
+        def fetch():
+            # The upstream JSON is forwarded as is, so it is never decoded.
+            with application.raw_responses():
+                result = self._call_upstream(application, route, kwargs)
+            if 200 <= result.status < 300:
+                self.cache.set(key, result)
+            return result
+
+        result, shared = self._flight.do(key, fetch)
+        if shared:
+            self.metrics.incr('coalesced')
+        return result.status, result
+
+    def _check_required(self, route, kwargs):
+        missing = [arg for arg in route.required if arg not in kwargs]
+        if missing:
+            raise GatewayError(400, 'Missing arguments for %s: %s' % (
+                route.name, ', '.join(missing)))
+
+    def _stream_pages(self, application, route, kwargs):
+        params = dict(kwargs.get('params') or {})
+        try:
+            start = int(params.get('start', 0))
+            count = int(params.get('count', self.page_size))
+        except ValueError:
+            raise GatewayError(400, 'start and count must be integers')
+
+        def fetch(position):
+            params.update({'start': position, 'count': count})
+            page = self._call_upstream(application, route,
+                                       dict(kwargs, params=dict(params)))
+            collection = _find_collection(page)
+            return collection.get('values', []), collection.get('_total', 0)
+
+        # The first page is fetched before the status line is sent, so that
+        # its errors are answered with a proper status.
+        first_page = fetch(start)
+
+        def chunks():
+            yield b'{"values": ['
+            first = True
+            position = start
+            values, total = first_page
+            while True:
+                for value in values:
+                    chunk = json.dumps(value).encode('utf8')
+                    yield chunk if first else b',' + chunk
+                    first = False
+                position += len(values)
+                if len(values) < count or position >= total:
+                    break
+                values, total = fetch(position)
+            yield (']}').encode('utf8')
+
+        return chunks()
+
+    def _make_handler(self):
+        gateway = self
+
+        class GatewayHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _token(self):
+                auth = self.headers.get('Authorization') or ''
+                if auth.lower().startswith('bearer '):
+                    return auth[7:].strip()
+                return None
+
+            def _respond(self, method, body=None):
+                try:
+                    status, payload = gateway.dispatch(self._token(), method,
+                                                       self.path, body)
+                except GatewayError as error:
+                    status, payload = error.status, {'error': error.message}
+                except LinkedInError as error:
+                    status = status_for_exception(error)
+                    payload = {'error': str(error)}
+                except requests.RequestException as error:
+                    status, payload = 502, {'error': str(error)}
+                except Exception:
+                    status, payload = 500, {'error': 'Internal gateway error'}
+
+                if isinstance(payload, RawResponse):
+                    self._send_body(status, payload.body or b'')
+                elif isinstance(payload, (dict, list, bool)) or payload is None:
+                    self._send_json(status, payload)
+                else:
+                    self._send_chunked(status, payload)
+
+            def _send_json(self, status, payload):
+                self._send_body(status, json.dumps(payload).encode('utf8'))
+
+            def _send_body(self, status, body):
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_chunked(self, status, chunks):
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                try:
+                    for chunk in chunks:
+                        self.wfile.write(('%x\r\n' % len(chunk)).encode('ascii'))
+                        self.wfile.write(chunk + b'\r\n')
+                except (LinkedInError, GatewayError, requests.RequestException):
+                    # The status line is gone already; cut the stream short so
+                    # that the client sees an incomplete body.
+                    self.close_connection = True
+                    return
+                self.wfile.write(b'0\r\n\r\n')
+
+            def do_GET(self):
+                self._respond('GET')
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                self._respond('POST', self.rfile.read(length).decode('utf8'))
+
+            def log_message(self, format, *args):
+                pass
+
+        return GatewayHandler
+
+    def serve_forever(self, host='', port=8080):
+        self._httpd = _ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.serve_forever()
+
+    def start(self, host='', port=8080):
+        """
+        Starts serving on a background thread.
+        """
+        self._httpd = _ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread = threading.Thread(target=self._httpd.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    @property
+    def server_address(self):
+        return self._httpd.server_address if self._httpd else None
+
+    def shutdown(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def _find_collection(page):
+    # Search results nest the collection, e.g. {'people': {'values': [...]}}.
+    if 'values' in page or '_total' in page:
+        return page
+    for value in page.values():
+        if isinstance(value, dict) and ('values' in value or '_total' in value):
+            return value
+    return {}
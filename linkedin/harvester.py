@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+import collections
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+
+from .exceptions import LinkedInError
+from .linkedin import LinkedInSelector
+
+
+__all__ = ['GroupHarvester', 'HarvestRecord']
+
+HarvestRecord = collections.namedtuple('HarvestRecord', [
+    'group_id', 'post', 'comments', 'error'])
+
+_PAGE, _COMMENTS, _REFRESH = 'page', 'comments', 'refresh'
+
+
+def _values(page):
+    return (page or {}).get('values', [])
+
+
+def _has_more(page, start, count):
+    values = _values(page)
+    total = (page or {}).get('_total')
+    if len(values) < count:
+        return False
+    return total is None or start + len(values) < total
+
+
+class GroupHarvester(object):
+    """
+    Streams the discussions of one or many groups together with their
+    comments.
+
+    Pages of posts are fetched one after the other per group, but every
+    post's comments are requested as soon as its page arrives, while the
+    next page is already loading, and groups are harvested side by side.
+    The wall time is therefore bounded by the slowest chain of requests
+    instead of the sum of all of them. At most ``max_workers`` requests are
+    in flight.
+
+    Usage:
+        harvester = GroupHarvester(application, max_workers=8)
+        for record in harvester.harvest([12345, 67890]):
+            store(record.group_id, record.post, record.comments)
+    """
+
+    def __init__(self, application, max_workers=8, page_size=20,
+                 comments_page_size=100, post_selectors=None,
+                 comment_selectors=None, refresh_batch_size=20):
+        self.application = application
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.comments_page_size = comments_page_size
+        if post_selectors:
+            # Comments are looked up by post id.
+            post_selectors = LinkedInSelector.merge(['id'], post_selectors)
+        self.post_selectors = post_selectors
+        self.comment_selectors = comment_selectors
+        self.refresh_batch_size = refresh_batch_size
+
+    def _fetch_posts(self, group_id, start, params):
+        params = dict(params or {}, start=start, count=self.page_size)
+        return self.application.get_posts(group_id, selectors=self.post_selectors,
+                                          params=params)
+
+    def _fetch_comments(self, post_id):
+        comments = []
+        start = 0
+        while True:
+            page = self.application.get_post_comments(
+                post_id, selectors=self.comment_selectors,
+                params={'start': start, 'count': self.comments_page_size})
+            comments.extend(_values(page))
+            if not _has_more(page, start, self.comments_page_size):
+                return comments
+            start += len(_values(page))
+
+    def _refresh_batch(self, group_id, post_ids):
+        return self.application.get_posts(group_id, post_ids=post_ids,
+                                          selectors=self.post_selectors)
+
+    def harvest(self, group_ids, params=None, with_comments=True):
+        """
+        Yields a HarvestRecord per post of the given groups, in completion
+        order. ``params`` are passed to get_posts, e.g. ``{'order': 'recency'}``.
+        A failed page yields a record with ``post`` set to None and the error.
+        """
+        if not isinstance(group_ids, (list, tuple, set)):
+            group_ids = [group_ids]
+        tasks = [(_PAGE, group_id, 0) for group_id in group_ids]
+        return self._run(tasks, params, with_comments)
+
+    def refresh(self, group_id, post_ids, with_comments=False):
+        """
+        Re-fetches known posts of a group using batched
+        ``posts::(id,id,...)`` requests and yields a HarvestRecord per post.
+        """
+        post_ids = list(post_ids)
+        size = self.refresh_batch_size
+        tasks = [(_REFRESH, group_id, post_ids[i:i + size])
+                 for i in range(0, len(post_ids), size)]
+        return self._run(tasks, None, with_comments)
+
+    def _submit(self, executor, task, params):
+        kind, group_id, arg = task
+        if kind == _PAGE:
+            return executor.submit(self._fetch_posts, group_id, arg, params)
+        if kind == _REFRESH:
+            return executor.submit(self._refresh_batch, group_id, arg)
+        return executor.submit(self._fetch_comments, arg['id'])
+
+    def _run(self, tasks, params, with_comments):
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {}
+            for task in tasks:
+                pending[self._submit(executor, task, params)] = task
+            while pending:
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, group_id, arg = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except (LinkedInError, requests.RequestException) as error:
+                        post = arg if kind == _COMMENTS else None
+                        yield HarvestRecord(group_id, post, None, error)
+                        continue
+
+                    if kind == _COMMENTS:
+                        yield HarvestRecord(group_id, arg, result, None)
+                        continue
+                    if kind == _PAGE and _has_more(result, arg, self.page_size):
+                        task = (_PAGE, group_id, arg + len(_values(result)))
+                        pending[self._submit(executor, task, params)] = task
+                    for post in _values(result):
+                        if with_comments:
+                            task = (_COMMENTS, group_id, post)
+                            pending[self._submit(executor, task, params)] = task
+                        else:
+                            yield HarvestRecord(group_id, post, None, None)
@@ -3,6 +3,9 @@ from __future__ import unicode_literals
 import contextlib
 import hashlib
 import random
+import threading
+import time
+from collections import OrderedDict
 
 try:
     from urllib.parse import quote, quote_plus
@@ -12,9 +15,13 @@ except ImportError:
 import requests
 from requests_oauthlib import OAuth1
 
-from .exceptions import LinkedInError
-from .models import AccessToken, LinkedInInvitation, LinkedInMessage
-from .utils import enum, to_utf8, raise_for_error, json, StringIO
+from .exceptions import LinkedInError, LinkedInCircuitOpenError
+from .metrics import LinkedInMetrics
+from .models import (AccessToken, LinkedInInvitation, LinkedInMessage,
+                     LinkedInShare, LinkedInGroupPost, RawResponse)
+from .profiling import Profiler, profiled, current_span, activate, timer
+from .utils import (enum, to_utf8, raise_for_error, json, StringIO,
+                    ACCEPT_ENCODING, gzip_compress, wire_length, endpoint_name)
 
 
 __all__ = ['LinkedInAuthentication', 'LinkedInApplication', 'PERMISSIONS']
@@ -79,14 +86,18 @@ class LinkedInAuthentication(object):
     AUTHORIZATION_URL = 'https://www.linkedin.com/uas/oauth2/authorization'
     ACCESS_TOKEN_URL = 'https://www.linkedin.com/uas/oauth2/accessToken'
 
-    def __init__(self, key, secret, redirect_uri, permissions=None):
+    def __init__(self, key, secret, redirect_uri, permissions=None, session=None):
         self.key = key
         self.secret = secret
         self.redirect_uri = redirect_uri
         self.permissions = permissions or []
+        # An optional requests.Session so that code exchanges can share a
+        # connection pool.
+        self.session = session
         self.state = None
         self.authorization_code = None
         self.token = None
+        self.token_issued_at = None
         self._error = None
 
     @property
@@ -117,48 +128,292 @@ class LinkedInAuthentication(object):
               'redirect_uri': self.redirect_uri,
               'client_id': self.key,
               'client_secret': self.secret}
-        response = requests.post(self.ACCESS_TOKEN_URL, data=qd, timeout=timeout)
+        issued_at = time.time()
+        response = (self.session or requests).post(self.ACCESS_TOKEN_URL, data=qd,
+                                                   timeout=timeout)
         raise_for_error(response)
         response = response.json()
         self.token = AccessToken(response['access_token'], response['expires_in'])
+        self.token_issued_at = issued_at
         return self.token
 
 
 class LinkedInSelector(object):
     @classmethod
     def parse(cls, selector):
+        span = current_span()
+        if span is None:
+            return cls._parse(selector)
+        with span.phase('selector'):
+            return cls._parse(selector)
+
+    @classmethod
+    def _parse(cls, selector):
         with contextlib.closing(StringIO()) as result:
             if type(selector) == dict:
                 for k, v in selector.items():
-                    result.write('%s:(%s)' % (to_utf8(k), cls.parse(v)))
+                    result.write('%s:(%s)' % (to_utf8(k), cls._parse(v)))
             elif type(selector) in (list, tuple):
-                result.write(','.join(map(cls.parse, selector)))
+                result.write(','.join(map(cls._parse, selector)))
             else:
                 result.write(to_utf8(selector))
             return result.getvalue()
 
+    @classmethod
+    def tree(cls, selector):
+        """
+        Normalizes a selector given as a string, list, tuple or dict into a
+        ``{field: subtree}`` mapping. Fields without sub-selectors map to an
+        empty dict.
+        """
+        result = OrderedDict()
+        if not selector:
+            return result
+        if type(selector) == dict:
+            for k, v in selector.items():
+                cls._merge_tree(result, {to_utf8(k): cls.tree(v)})
+        elif type(selector) in (list, tuple):
+            for item in selector:
+                cls._merge_tree(result, cls.tree(item))
+        else:
+            cls._merge_tree(result, cls._parse_string(to_utf8(selector)))
+        return result
+
+    @classmethod
+    def merge(cls, *selectors):
+        """
+        Returns a selector that requests the union of the fields requested by
+        all of the given selectors.
+        """
+        result = OrderedDict()
+        for selector in selectors:
+            cls._merge_tree(result, cls.tree(selector))
+        return cls.from_tree(result)
+
+    @classmethod
+    def from_tree(cls, tree):
+        selector = []
+        for field, subtree in tree.items():
+            if subtree:
+                selector.append({field: cls.from_tree(subtree)})
+            else:
+                selector.append(field)
+        return selector
+
+    @classmethod
+    def project(cls, data, selector):
+        """
+        Strips the fields of an API response that were not requested by the
+        given selector. Meta fields such as ``_total`` and ``_key`` are kept.
+        """
+        return cls._project(data, cls.tree(selector))
+
+    @classmethod
+    def field_name(cls, field):
+        """
+        Returns the key LinkedIn uses in JSON responses for a selector field,
+        e.g. ``first-name`` -> ``firstName``.
+        """
+        field = field.split('::', 1)[0]
+        head, _, tail = field.partition('-')
+        return head + ''.join(part[:1].upper() + part[1:]
+                              for part in tail.split('-') if part)
+
+    @classmethod
+    def _project(cls, data, tree):
+        if not tree:
+            return data
+        if isinstance(data, list):
+            return [cls._project(item, tree) for item in data]
+        if not isinstance(data, dict):
+            return data
+        result = dict((k, v) for k, v in data.items() if k.startswith('_'))
+        if 'values' in data and '_total' in data:
+            # A collection; project every member with the same selector.
+            result['values'] = cls._project(data['values'], tree)
+            return result
+        for field, subtree in tree.items():
+            key = cls.field_name(field)
+            if key in data:
+                result[key] = cls._project(data[key], subtree)
+        return result
+
+    @classmethod
+    def _merge_tree(cls, target, source):
+        for field, subtree in source.items():
+            if field not in target:
+                target[field] = OrderedDict()
+                cls._merge_tree(target[field], subtree)
+            elif not target[field] or not subtree:
+                # A bare field selects all of it and wins over any sub-selection.
+                target[field] = OrderedDict()
+            else:
+                cls._merge_tree(target[field], subtree)
+        return target
+
+    @classmethod
+    def _parse_string(cls, selector):
+        # Parses the textual form produced by ``parse``, e.g.
+        # 'id,positions:(title,company:(name)),picture-urls::(original)'.
+        def parse_fields(pos):
+            fields = OrderedDict()
+            while pos < len(selector):
+                end = pos
+                while end < len(selector) and selector[end] not in ',:()':
+                    end += 1
+                if selector.startswith('::(', end):
+                    # Keys such as picture-urls::(original) are field names.
+                    end = selector.index(')', end) + 1
+                name = selector[pos:end].strip()
+                pos = end
+                subtree = OrderedDict()
+                if selector.startswith(':(', pos):
+                    subtree, pos = parse_fields(pos + 2)
+                if name:
+                    cls._merge_tree(fields, {name: subtree})
+                if pos < len(selector) and selector[pos] == ')':
+                    return fields, pos + 1
+                pos += 1
+            return fields, pos
+
+        return parse_fields(0)[0]
+
 
 class LinkedInApplication(object):
     BASE_URL = 'https://api.linkedin.com'
 
-    def __init__(self, authentication=None, token=None):
+    def __init__(self, authentication=None, token=None, metrics=None,
+                 compress_threshold=None, session=None, token_manager=None,
+                 circuit_breakers=None, scheduler=None, profiler=None, store=None):
+        """
+        Request bodies of at least ``compress_threshold`` bytes are sent
+        gzip-compressed; compression of request bodies is disabled by default.
+        Passing a requests.Session lets several applications share one
+        connection pool. With a ``token_manager`` (see linkedin.tokens) the
+        access token is checked for expiry and swapped for its refreshed
+        replacement before every request; tokens obtained through
+        get_access_token are tracked automatically, others must be tracked
+        with their issue time. ``circuit_breakers`` takes a
+        linkedin.breaker.CircuitBreakerRegistry; calls to an endpoint whose
+        circuit is open fail fast with LinkedInCircuitOpenError. With a
+        linkedin.scheduler.RequestScheduler requests are queued on priority
+        lanes, see ``priority``. ``profiler`` is a linkedin.profiling.Profiler,
+        shared by several applications if needed; it is created disabled.
+        With a linkedin.store.LocalStore every fetched profile, company and job
+        is kept locally and repeated searches are answered from it while fresh.
+        """
         assert authentication or token, 'Either authentication instance or access token is required'
         self.authentication = authentication
         if not self.authentication:
             self.authentication = LinkedInAuthentication('', '', '')
             self.authentication.token = AccessToken(token, None)
+        self.metrics = metrics or LinkedInMetrics()
+        self.compress_threshold = compress_threshold
+        self.session = session
+        self.token_manager = token_manager
+        token = getattr(self.authentication, 'token', None)
+        issued_at = getattr(self.authentication, 'token_issued_at', None)
+        if token_manager is not None and token is not None and issued_at is not None:
+            if token_manager.expires_at(token) is None:
+                token_manager.track(token, issued_at)
+        self.circuit_breakers = circuit_breakers
+        if circuit_breakers is not None:
+            circuit_breakers.attach(self.metrics)
+        self.scheduler = scheduler
+        self._context = threading.local()
+        self.profiler = profiler or Profiler()
+        self.store = store
+
+    @contextlib.contextmanager
+    def priority(self, lane, timeout=None, deadline=None):
+        """
+        Sends the requests made by the current thread inside the block on the
+        given scheduler lane. Requests that can not be sent within ``timeout``
+        seconds (or before the absolute ``deadline``) are dropped with
+        LinkedInDeadlineExceededError:
+
+            with application.priority('interactive', timeout=2):
+                application.get_profile()
+        """
+        if timeout is not None:
+            deadline = time.time() + timeout
+        previous = getattr(self._context, 'lane', None), getattr(self._context, 'deadline', None)
+        self._context.lane, self._context.deadline = lane, deadline
+        try:
+            yield
+        finally:
+            self._context.lane, self._context.deadline = previous
+
+    @contextlib.contextmanager
+    def raw_responses(self, sink=None, chunk_size=64 * 1024, as_memoryview=False):
+        """
+        Makes the endpoints called by the current thread inside the block
+        return a RawResponse with the undecoded JSON body instead of the
+        decoded object, after the usual error checking. Error responses
+        without a body are not raised and are returned with their status.
+        The body is always decompressed, so the headers carry no
+        Content-Encoding or Content-Length. With ``sink`` (any
+        object with a ``write`` method) the body is streamed into it in
+        chunks of ``chunk_size`` bytes and never held in memory as a whole:
+
+            with application.raw_responses(sink=open('people.json', 'wb')):
+                application.search_profile(params={'keywords': 'python'})
+        """
+        previous = getattr(self._context, 'raw', None)
+        self._context.raw = (sink, chunk_size, as_memoryview)
+        try:
+            yield
+        finally:
+            self._context.raw = previous
 
     def make_request(self, method, url, data=None, params=None, headers=None,
                      timeout=60):
+        raw = getattr(self._context, 'raw', None)
+        stream = raw is not None and raw[0] is not None
+        if self.scheduler is None or self.scheduler.in_worker:
+            return self._make_request(method, url, data, params, headers, timeout,
+                                      stream)
+
+        deadline = getattr(self._context, 'deadline', None)
+        span = current_span()
+        queued = timer()
+
+        def send():
+            if span is not None:
+                span.add('queue', queued)
+            request_timeout = timeout
+            if deadline is not None:
+                request_timeout = min(timeout, max(deadline - time.time(), 0.001))
+            with activate(span):
+                return self._make_request(method, url, data, params, headers,
+                                          request_timeout, stream)
+
+        return self.scheduler.submit(send, getattr(self._context, 'lane', None),
+                                     deadline)
+
+    def _make_request(self, method, url, data=None, params=None, headers=None,
+                      timeout=60, stream=False):
         if headers is None:
             headers = {'x-li-format': 'json', 'Content-Type': 'application/json'}
         else:
             headers.update({'x-li-format': 'json', 'Content-Type': 'application/json'})
+        headers.setdefault('Accept-Encoding', ACCEPT_ENCODING)
+
+        sent = 0
+        if data is not None:
+            if not isinstance(data, bytes):
+                data = data.encode('utf8')
+            sent = len(data)
+            if self.compress_threshold is not None and sent >= self.compress_threshold:
+                data = gzip_compress(data)
+                headers['Content-Encoding'] = 'gzip'
 
         if params is None:
             params = {}
         kw = dict(data=data, params=params,
                   headers=headers, timeout=timeout)
+        if stream:
+            kw['stream'] = True
 
         if isinstance(self.authentication, LinkedInDeveloperAuthentication):
             # Let requests_oauthlib.OAuth1 do *all* of the work here
@@ -166,10 +421,133 @@ class LinkedInApplication(object):
                           self.authentication.user_token, self.authentication.user_secret)
             kw.update({'auth': auth})
         else:
+            if self.token_manager is not None:
+                self.authentication.token = self.token_manager.check(self.authentication.token)
             params.update({'oauth2_access_token': self.authentication.token.access_token})
 
-        return requests.request(method.upper(), url, **kw)
-
+        breaker = None
+        if self.circuit_breakers is not None:
+            breaker = self.circuit_breakers.get(endpoint_name(url))
+            try:
+                breaker.before_call()
+            except LinkedInCircuitOpenError:
+                self.metrics.incr('circuit_rejections')
+                raise
+
+        span = current_span()
+        started = time.time()
+        try:
+            if span is None:
+                response = (self.session or requests).request(method.upper(), url, **kw)
+            else:
+                response = self._send_profiled(span, method, url, kw)
+        except requests.RequestException:
+            if breaker is not None:
+                breaker.record(False, time.time() - started)
+            raise
+        except BaseException:
+            # Not an outcome of the endpoint; give back a half-open probe slot.
+            if breaker is not None:
+                breaker.release()
+            raise
+        if breaker is not None:
+            breaker.record(response.status_code < 500, time.time() - started)
+        self._record_transfer(response, sent, len(data) if data is not None else 0,
+                              stream)
+        return response
+
+    def _send_profiled(self, span, method, url, kw):
+        # Does what Session.request does, in two steps so that signing and
+        # the network round trip are timed separately.
+        session = self.session or requests.Session()
+        try:
+            with span.phase('sign'):
+                prepared = session.prepare_request(requests.Request(
+                    method.upper(), url, data=kw['data'], params=kw['params'],
+                    headers=kw['headers'], auth=kw.get('auth')))
+                settings = session.merge_environment_settings(
+                    prepared.url, {}, kw.get('stream'), None, None)
+            with span.phase('network'):
+                return session.send(prepared, timeout=kw['timeout'], **settings)
+        finally:
+            if session is not self.session:
+                session.close()
+
+    def _process_response(self, response):
+        raw = getattr(self._context, 'raw', None)
+        if raw is not None:
+            return self._raw_response(response, *raw)
+        span = current_span()
+        if span is None:
+            raise_for_error(response)
+            result = response.json()
+        else:
+            with span.phase('raise_for_error'):
+                raise_for_error(response)
+            with span.phase('decode'):
+                result = response.json()
+        if self.store is not None and response.request.method == 'GET':
+            self.store.ingest(response.url, result)
+        return result
+
+    def _search(self, url, params=None, headers=None):
+        store = self.store
+        if store is None or getattr(self._context, 'raw', None) is not None:
+            response = self.make_request('GET', url, params=params, headers=headers)
+            return self._process_response(response)
+        # make_request adds the access token to params.
+        query = dict(params or {})
+        result = store.cached_search(url, query)
+        if result is None:
+            response = self.make_request('GET', url, params=params, headers=headers)
+            result = self._process_response(response)
+            store.remember_search(url, query, result)
+        return result
+
+    def _raw_response(self, response, sink, chunk_size, as_memoryview):
+        raise_for_error(response)
+        if sink is None:
+            body = response.content
+            length = len(body)
+            if as_memoryview:
+                body = memoryview(body)
+        else:
+            body = None
+            length = 0
+            try:
+                for chunk in response.iter_content(chunk_size):
+                    sink.write(chunk)
+                    length += len(chunk)
+            finally:
+                response.close()
+            self._record_received(response, length)
+        # The body has been decoded already; these would describe the
+        # encoded body on the wire.
+        headers = response.headers.copy()
+        for name in ('Content-Encoding', 'Content-Length', 'Transfer-Encoding'):
+            headers.pop(name, None)
+        return RawResponse(response.status_code, headers, body, length)
+
+    def _record_transfer(self, response, sent, sent_on_wire, stream=False):
+        metrics = self.metrics
+        metrics.incr('requests')
+        metrics.incr('bytes_sent', sent_on_wire)
+        metrics.incr('bytes_sent_uncompressed', sent)
+        if not stream:
+            # Streamed bodies are counted once they have been consumed.
+            self._record_received(response, len(response.content or b''))
+
+    def _record_received(self, response, length):
+        received = wire_length(response, length)
+        if received is None:
+            # A compressed chunked body; counting its decoded length as
+            # received bytes would skew the compression ratio.
+            self.metrics.incr('bytes_received_unmeasured', length)
+            return
+        self.metrics.incr('bytes_received', received)
+        self.metrics.incr('bytes_received_uncompressed', length)
+
+    @profiled
     def get_profile(self, member_id=None, member_url=None, selectors=None,
                     params=None, headers=None):
         if member_id:
@@ -187,19 +565,18 @@ class LinkedInApplication(object):
             url = '%s:(%s)' % (url, LinkedInSelector.parse(selectors))
 
         response = self.make_request('GET', url, params=params, headers=headers)
-        raise_for_error(response)
-        return response.json()
+        return self._process_response(response)
 
+    @profiled
     def search_profile(self, selectors=None, params=None, headers=None):
         if selectors:
             url = '%s:(%s)' % (ENDPOINTS.PEOPLE_SEARCH,
                                LinkedInSelector.parse(selectors))
         else:
             url = ENDPOINTS.PEOPLE_SEARCH
-        response = self.make_request('GET', url, params=params, headers=headers)
-        raise_for_error(response)
-        return response.json()
+        return self._search(url, params, headers)
 
+    @profiled
     def get_picture_urls(self, member_id=None, member_url=None,
                          params=None, headers=None):
         if member_id:
@@ -211,9 +588,9 @@ class LinkedInApplication(object):
             url = '%s/~/picture-urls::(original)' % ENDPOINTS.PEOPLE
 
         response = self.make_request('GET', url, params=params, headers=headers)
-        raise_for_error(response)
-        return response.json()
+        return self._process_response(response)
 
+    @profiled
     def get_connections(self, member_id=None, member_url=None, selectors=None,
                         params=None, headers=None):
         if member_id:
@@ -227,9 +604,9 @@ class LinkedInApplication(object):
             url = '%s:(%s)' % (url, LinkedInSelector.parse(selectors))
 
         response = self.make_request('GET', url, params=params, headers=headers)
-        raise_for_error(response)
-        return response.json()
+        return self._process_response(response)
 
+    @profiled
     def get_memberships(self, member_id=None, member_url=None, group_id=None,
                         selectors=None, params=None, headers=None):
         if member_id:
@@ -247,16 +624,16 @@ class LinkedInApplication(object):
             url = '%s:(%s)' % (url, LinkedInSelector.parse(selectors))
 
         response = self.make_request('GET', url, params=params, headers=headers)
-        raise_for_error(response)
-        return response.json()
+        return self._process_response(response)
 
+    @profiled
     def get_group(self, group_id, selectors=None, params=None, headers=None):
         url = '%s/%s' % (ENDPOINTS.GROUPS, str(group_id))
 
         response = self.make_request('GET', url, params=params, headers=headers)
-        raise_for_error(response)
-        return response.json()
+        return self._process_response(response)
 
+    @profiled
     def get_posts(self, group_id, post_ids=None, selectors=None, params=None,
                   headers=None):
         url = '%s/%s/posts' % (ENDPOINTS.GROUPS, str(group_id))
@@ -266,18 +643,18 @@ class LinkedInApplication(object):
             url = '%s:(%s)' % (url, LinkedInSelector.parse(selectors))
 
         response = self.make_request('GET', url, params=params, headers=headers)
-        raise_for_error(response)
-        return response.json()
+        return self._process_response(response)
 
+    @profiled
     def get_post_comments(self, post_id, selectors=None, params=None, headers=None):
         url = '%s/%s/comments' % (ENDPOINTS.POSTS, post_id)
         if selectors:
             url = '%s:(%s)' % (url, LinkedInSelector.parse(selectors))
 
         response = self.make_request('GET', url, params=params, headers=headers)
-        raise_for_error(response)
-        return response.json()
+        return self._process_response(response)
 
+    @profiled
     def join_group(self, group_id):
         url = '%s/~/group-memberships/%s' % (ENDPOINTS.PEOPLE, str(group_id))
         response = self.make_request('PUT', url,
@@ -285,30 +662,25 @@ class LinkedInApplication(object):
         raise_for_error(response)
         return True
 
+    @profiled
     def leave_group(self, group_id):
         url = '%s/~/group-memberships/%s' % (ENDPOINTS.PEOPLE, str(group_id))
         response = self.make_request('DELETE', url)
         raise_for_error(response)
         return True
 
+    @profiled
     def submit_group_post(self, group_id, title, summary, submitted_url,
                           submitted_image_url, content_title, description):
-        post = {
-            'title': title, 'summary': summary,
-            'content': {
-                'submitted-url': submitted_url,
-                'title': content_title,
-                'description': description
-            }
-        }
-        if submitted_image_url:
-            post['content']['submitted-image-url'] = submitted_image_url
+        post = LinkedInGroupPost(title, summary, submitted_url, submitted_image_url,
+                                 content_title, description).json
 
         url = '%s/%s/posts' % (ENDPOINTS.GROUPS, str(group_id))
         response = self.make_request('POST', url, data=json.dumps(post))
         raise_for_error(response)
         return True
 
+    @profiled
     def like_post(self, post_id, action):
         url = '%s/%s/relation-to-viewer/is-liked' % (ENDPOINTS.POSTS, str(post_id))
         try:
@@ -318,6 +690,7 @@ class LinkedInApplication(object):
         else:
             return True
 
+    @profiled
     def comment_post(self, post_id, comment):
         post = {
             'text': comment
@@ -330,13 +703,14 @@ class LinkedInApplication(object):
         else:
             return True
 
+    @profiled
     def get_company_by_email_domain(self, email_domain, params=None, headers=None):
         url = '%s?email-domain=%s' % (ENDPOINTS.COMPANIES, email_domain)
 
         response = self.make_request('GET', url, params=params, headers=headers)
-        raise_for_error(response)
-        return response.json()
+        return self._process_response(response)
 
+    @profiled
     def get_companies(self, company_ids=None, universal_names=None, selectors=None,
                       params=None, headers=None):
         identifiers = []
@@ -354,24 +728,24 @@ class LinkedInApplication(object):
             url = '%s:(%s)' % (url, LinkedInSelector.parse(selectors))
 
         response = self.make_request('GET', url, params=params, headers=headers)
-        raise_for_error(response)
-        return response.json()
+        return self._process_response(response)
 
+    @profiled
     def get_company_updates(self, company_id, params=None, headers=None):
         url = '%s/%s/updates' % (ENDPOINTS.COMPANIES, str(company_id))
         response = self.make_request('GET', url, params=params, headers=headers)
-        raise_for_error(response)
-        return response.json()
+        return self._process_response(response)
 
+    @profiled
     def get_company_products(self, company_id, selectors=None, params=None,
                              headers=None):
         url = '%s/%s/products' % (ENDPOINTS.COMPANIES, str(company_id))
         if selectors:
             url = '%s:(%s)' % (url, LinkedInSelector.parse(selectors))
         response = self.make_request('GET', url, params=params, headers=headers)
-        raise_for_error(response)
-        return response.json()
+        return self._process_response(response)
 
+    @profiled
     def follow_company(self, company_id):
         url = '%s/~/following/companies' % ENDPOINTS.PEOPLE
         post = {'id': company_id}
@@ -379,96 +753,69 @@ class LinkedInApplication(object):
         raise_for_error(response)
         return True
 
+    @profiled
     def unfollow_company(self, company_id):
         url = '%s/~/following/companies/id=%s' % (ENDPOINTS.PEOPLE, str(company_id))
         response = self.make_request('DELETE', url)
         raise_for_error(response)
         return True
 
+    @profiled
     def search_company(self, selectors=None, params=None, headers=None):
         url = ENDPOINTS.COMPANY_SEARCH
         if selectors:
             url = '%s:(%s)' % (url, LinkedInSelector.parse(selectors))
 
-        response = self.make_request('GET', url, params=params, headers=headers)
-        raise_for_error(response)
-        return response.json()
+        return self._search(url, params, headers)
 
+    @profiled
     def submit_company_share(self, company_id, comment=None, title=None, description=None,
                              submitted_url=None, submitted_image_url=None,
                              visibility_code='anyone'):
-
-        post = {
-            'visibility': {
-                'code': visibility_code,
-            },
-        }
-        if comment is not None:
-            post['comment'] = comment
-        if title is not None and submitted_url is not None:
-            post['content'] = {
-                'title': title,
-                'submitted-url': submitted_url,
-                'description': description,
-            }
-        if submitted_image_url:
-            post['content']['submitted-image-url'] = submitted_image_url
+        post = LinkedInShare(comment, title, description, submitted_url,
+                             submitted_image_url, visibility_code).json
 
         url = '%s/%s/shares' % (ENDPOINTS.COMPANIES, company_id)
 
         response = self.make_request('POST', url, data=json.dumps(post))
-        raise_for_error(response)
-        return response.json()
+        return self._process_response(response)
 
+    @profiled
     def get_job(self, job_id, selectors=None, params=None, headers=None):
         url = '%s/%s' % (ENDPOINTS.JOBS, str(job_id))
         url = '%s:(%s)' % (url, LinkedInSelector.parse(selectors))
         response = self.make_request('GET', url, params=params, headers=headers)
-        raise_for_error(response)
-        return response.json()
+        return self._process_response(response)
 
+    @profiled
     def get_job_bookmarks(self, selectors=None, params=None, headers=None):
         url = '%s/~/job-bookmarks' % ENDPOINTS.PEOPLE
         if selectors:
             url = '%s:(%s)' % (url, LinkedInSelector.parse(selectors))
 
         response = self.make_request('GET', url, params=params, headers=headers)
-        raise_for_error(response)
-        return response.json()
+        return self._process_response(response)
 
+    @profiled
     def search_job(self, selectors=None, params=None, headers=None):
         url = ENDPOINTS.JOB_SEARCH
         if selectors:
             url = '%s:(%s)' % (url, LinkedInSelector.parse(selectors))
 
-        response = self.make_request('GET', url, params=params, headers=headers)
-        raise_for_error(response)
-        return response.json()
+        return self._search(url, params, headers)
 
+    @profiled
     def submit_share(self, comment=None, title=None, description=None,
                      submitted_url=None, submitted_image_url=None,
                      visibility_code='anyone'):
-        post = {
-            'visibility': {
-                'code': visibility_code,
-            },
-        }
-        if comment is not None:
-            post['comment'] = comment
-        if title is not None and submitted_url is not None:
-            post['content'] = {
-                'title': title,
-                'submitted-url': submitted_url,
-                'description': description,
-            }
-        if submitted_image_url:
-            post['content']['submitted-image-url'] = submitted_image_url
+        post = LinkedInShare(comment, title, description, submitted_url,
+                             submitted_image_url, visibility_code).json
 
         url = '%s/~/shares' % ENDPOINTS.PEOPLE
         response = self.make_request('POST', url, data=json.dumps(post))
-        raise_for_error(response)
-        return response.json()
+        return self._process_response(response)
 
+    @profiled
     def get_network_updates(self, types, member_id=None,
                             self_scope=True, params=None, headers=None):
         if member_id:
@@ -487,9 +834,9 @@ class LinkedInApplication(object):
             params.update({'scope': 'self'})
 
         response = self.make_request('GET', url, params=params, headers=headers)
-        raise_for_error(response)
-        return response.json()
+        return self._process_response(response)
 
+    @profiled
     def get_network_update(self, types, update_key,
                            self_scope=True, params=None, headers=None):
         url = '%s/~/network/updates/key=%s' % (ENDPOINTS.PEOPLE, str(update_key))
@@ -504,15 +851,15 @@ class LinkedInApplication(object):
             params.update({'scope': 'self'})
 
         response = self.make_request('GET', url, params=params, headers=headers)
-        raise_for_error(response)
-        return response.json()
+        return self._process_response(response)
 
+    @profiled
     def get_network_status(self, params=None, headers=None):
         url = '%s/~/network/network-stats' % ENDPOINTS.PEOPLE
         response = self.make_request('GET', url, params=params, headers=headers)
-        raise_for_error(response)
-        return response.json()
+        return self._process_response(response)
 
+    @profiled
     def send_invitation(self, invitation):
         assert type(invitation) == LinkedInInvitation, 'LinkedInInvitation required'
         url = '%s/~/mailbox' % ENDPOINTS.PEOPLE
@@ -521,6 +868,7 @@ class LinkedInApplication(object):
         raise_for_error(response)
         return True
 
+    @profiled
     def send_message(self, message):
         assert type(message) == LinkedInMessage, 'LinkedInInvitation required'
         url = '%s/~/mailbox' % ENDPOINTS.PEOPLE
@@ -529,6 +877,7 @@ class LinkedInApplication(object):
         raise_for_error(response)
         return True
 
+    @profiled
     def comment_on_update(self, update_key, comment):
         comment = {'comment': comment}
         url = '%s/~/network/updates/key=%s/update-comments' % (ENDPOINTS.PEOPLE, update_key)
@@ -536,6 +885,7 @@ class LinkedInApplication(object):
         raise_for_error(response)
         return True
 
+    @profiled
     def like_update(self, update_key, is_liked=True):
         url = '%s/~/network/updates/key=%s/is-liked' % (ENDPOINTS.PEOPLE, update_key)
         response = self.make_request('PUT', url, data=json.dumps(is_liked))
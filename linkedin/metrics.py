@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import threading
+from collections import defaultdict
+
+
+__all__ = ['LinkedInMetrics']
+
+
+class LinkedInMetrics(object):
+    """
+    Thread-safe counters and gauges describing the traffic of a
+    LinkedInApplication. Gauges may be plain values or callables that are
+    evaluated when a snapshot is taken.
+    """
+
+    def __init__(self):
+        self._counters = defaultdict(int)
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self._counters[name] += value
+
+    def gauge(self, name, value):
+        with self._lock:
+            self._gauges[name] = value
+
+    def get(self, name, default=0):
+        with self._lock:
+            if name in self._counters:
+                return self._counters[name]
+            value = self._gauges.get(name, default)
+        return value() if callable(value) else value
+
+    def snapshot(self):
+        with self._lock:
+            result = dict(self._counters)
+            gauges = dict(self._gauges)
+        for name, value in gauges.items():
+            result[name] = value() if callable(value) else value
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+    @property
+    def compression_ratio(self):
+        """
+        Ratio of decoded to on-the-wire bytes received; 1.0 when nothing was
+        compressed.
+        """
+        received = self.get('bytes_received')
+        if not received:
+            return 1.0
+        return float(self.get('bytes_received_uncompressed')) / received
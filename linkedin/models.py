@@ -3,6 +3,8 @@ import collections
 
 AccessToken = collections.namedtuple('AccessToken', ['access_token', 'expires_in'])
 
+RawResponse = collections.namedtuple('RawResponse', ['status', 'headers', 'body', 'length'])
+
 
 class LinkedInRecipient(object):
     def __init__(self, member_id, email, first_name, last_name):
@@ -92,3 +94,61 @@ class LinkedInMessage(object):
             result['item-content']['invitation-request']['authorization'] = auth
 
         return result
+
+
+class LinkedInShare(object):
+    def __init__(self, comment=None, title=None, description=None,
+                 submitted_url=None, submitted_image_url=None,
+                 visibility_code='anyone'):
+        self.comment = comment
+        self.title = title
+        self.description = description
+        self.submitted_url = submitted_url
+        self.submitted_image_url = submitted_image_url
+        self.visibility_code = visibility_code
+
+    @property
+    def json(self):
+        result = {
+            'visibility': {
+                'code': self.visibility_code,
+            },
+        }
+        if self.comment is not None:
+            result['comment'] = self.comment
+        if self.title is not None and self.submitted_url is not None:
+            result['content'] = {
+                'title': self.title,
+                'submitted-url': self.submitted_url,
+                'description': self.description,
+            }
+        if self.submitted_image_url:
+            result.setdefault('content', {})['submitted-image-url'] = self.submitted_image_url
+
+        return result
+
+
+class LinkedInGroupPost(object):
+    def __init__(self, title, summary, submitted_url, submitted_image_url,
+                 content_title, description):
+        self.title = title
+        self.summary = summary
+        self.submitted_url = submitted_url
+        self.submitted_image_url = submitted_image_url
+        self.content_title = content_title
+        self.description = description
+
+    @property
+    def json(self):
+        result = {
+            'title': self.title, 'summary': self.summary,
+            'content': {
+                'submitted-url': self.submitted_url,
+                'title': self.content_title,
+                'description': self.description
+            }
+        }
+        if self.submitted_image_url:
+            result['content']['submitted-image-url'] = self.submitted_image_url
+
+        return result
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+import threading
+import warnings
+
+from .linkedin import LinkedInSelector
+
+
+__all__ = ['SelectorPlanner', 'PlannedRequest', 'UnreadFieldsWarning']
+
+
+class UnreadFieldsWarning(UserWarning):
+    pass
+
+
+class _ReadTracker(object):
+    def __init__(self):
+        self.reads = set()
+        self._lock = threading.Lock()
+
+    def mark(self, path):
+        with self._lock:
+            self.reads.add(path)
+
+
+class _TrackedDict(dict):
+    """
+    A response dict that remembers which of its keys have been looked up so
+    that fields requested through a selector but never read can be reported.
+    """
+
+    def __init__(self, data, tracker, path):
+        super(_TrackedDict, self).__init__(data)
+        self._tracker = tracker
+        self._path = path
+
+    def __getitem__(self, key):
+        self._tracker.mark(self._path + (key,))
+        return super(_TrackedDict, self).__getitem__(key)
+
+    def get(self, key, default=None):
+        self._tracker.mark(self._path + (key,))
+        return super(_TrackedDict, self).get(key, default)
+
+    def _mark_all(self):
+        for key in super(_TrackedDict, self).keys():
+            self._tracker.mark(self._path + (key,))
+
+    def __iter__(self):
+        self._mark_all()
+        return super(_TrackedDict, self).__iter__()
+
+    def items(self):
+        self._mark_all()
+        return super(_TrackedDict, self).items()
+
+    def values(self):
+        self._mark_all()
+        return super(_TrackedDict, self).values()
+
+
+def _track(data, tracker, path=()):
+    if isinstance(data, list):
+        return [_track(item, tracker, path) for item in data]
+    if not isinstance(data, dict):
+        return data
+    if 'values' in data and '_total' in data:
+        # Members of a collection are reported under the collection's path.
+        tracked = dict(data)
+        tracked['values'] = _track(data['values'], tracker, path)
+        return _TrackedDict(tracked, tracker, path)
+    return _TrackedDict(dict((k, _track(v, tracker, path + (k,)))
+                             for k, v in data.items()), tracker, path)
+
+
+def _leaf_paths(tree, path=()):
+    for field, subtree in tree.items():
+        key = path + (LinkedInSelector.field_name(field),)
+        if subtree:
+            for leaf in _leaf_paths(subtree, key):
+                yield leaf
+        else:
+            yield key
+
+
+class PlannedRequest(object):
+    """
+    A caller's share of a planned request. ``result`` holds the response
+    projected onto the caller's own selector once the planner has executed.
+    """
+
+    def __init__(self, selectors):
+        self.selectors = selectors
+        self.tree = LinkedInSelector.tree(selectors)
+        self.result = None
+        self.error = None
+        self._tracker = _ReadTracker()
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def get(self, timeout=None):
+        self._done.wait(timeout)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def unread_fields(self):
+        # Collections are transparent: 'positions.title' is read through
+        # result['positions']['values'][i]['title'].
+        reads = self._tracker.reads
+        return ['.'.join(path) for path in _leaf_paths(self.tree)
+                if path not in reads]
+
+    def _resolve(self, data):
+        self.result = _track(LinkedInSelector._project(data, self.tree),
+                             self._tracker)
+        self._done.set()
+
+    def _fail(self, error):
+        self.error = error
+        self._done.set()
+
+
+class SelectorPlanner(object):
+    """
+    Collects pending calls for the same resource that use different field
+    selectors and fetches them with a single API request using the union of
+    the selectors. Each caller gets back only the fields it asked for.
+
+    Usage:
+        planner = SelectorPlanner(application.get_profile, member_id='ID')
+        names = planner.add(['first-name', 'last-name'])
+        jobs = planner.add({'positions': ['title', {'company': 'name'}]})
+        planner.execute()
+        names.result, jobs.result
+    """
+
+    def __init__(self, method, *args, **kwargs):
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+        self._pending = []
+        self._executed = []
+        self._lock = threading.Lock()
+
+    def add(self, selectors):
+        request = PlannedRequest(selectors)
+        with self._lock:
+            self._pending.append(request)
+        return request
+
+    @property
+    def selectors(self):
+        with self._lock:
+            pending = list(self._pending)
+        return LinkedInSelector.merge(*[p.selectors for p in pending])
+
+    def execute(self):
+        """
+        Fetches the pending requests and returns the response. Requests
+        without selectors expect the default fields, which no field list
+        describes, so they are fetched by a separate request without one.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return None
+        defaults = [p for p in pending if not p.tree]
+        selected = [p for p in pending if p.tree]
+        groups = []
+        if defaults:
+            groups.append((defaults, None))
+        if selected:
+            groups.append((selected, LinkedInSelector.merge(
+                *[p.selectors for p in selected])))
+        data = error = None
+        for requests, selectors in groups:
+            try:
+                data = self.method(*self.args, **dict(self.kwargs, selectors=selectors))
+            except Exception as e:
+                error = error or e
+                for request in requests:
+                    request._fail(e)
+            else:
+                for request in requests:
+                    request._resolve(data)
+        self._executed = pending
+        if error is not None:
+            raise error
+        return data
+
+    def warn_unread(self, stacklevel=2):
+        """
+        Emits an ``UnreadFieldsWarning`` for every executed request that
+        selected fields it never read from its result.
+        """
+        for request in self._executed:
+            unread = request.unread_fields()
+            if unread:
+                warnings.warn('Selector %r requested fields that were never '
+                              'read: %s' % (LinkedInSelector.parse(request.selectors),
+                                            ', '.join(unread)),
+                              UnreadFieldsWarning, stacklevel=stacklevel)
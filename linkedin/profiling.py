@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+import collections
+import contextlib
+import functools
+import os
+import threading
+import time
+
+from .utils import json
+
+
+__all__ = ['Profiler', 'PHASES', 'profiled']
+
+try:
+    timer = time.perf_counter
+except AttributeError:
+    timer = time.time
+
+PHASES = ('selector', 'queue', 'sign', 'network', 'raise_for_error', 'decode',
+          'other')
+
+_local = threading.local()
+
+
+class CallSpan(object):
+    __slots__ = ('profiler', 'endpoint', 'start', 'end', 'phases', 'thread_id')
+
+    def __init__(self, profiler, endpoint):
+        self.profiler = profiler
+        self.endpoint = endpoint
+        self.start = timer()
+        self.end = None
+        self.phases = []
+        self.thread_id = threading.current_thread().ident
+
+    def add(self, phase, start, end=None):
+        self.phases.append((phase, start, (end or timer()) - start))
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = timer()
+        try:
+            yield
+        finally:
+            self.add(name, start)
+
+    def accounted(self):
+        return sum(duration for _, _, duration in self.phases)
+
+
+def current_span():
+    """
+    Returns the span of the endpoint call being profiled on this thread, or
+    None when profiling is off.
+    """
+    return getattr(_local, 'span', None)
+
+
+@contextlib.contextmanager
+def activate(span):
+    """
+    Makes ``span`` the current span of this thread, e.g. on the worker thread
+    that sends a scheduled request.
+    """
+    previous = getattr(_local, 'span', None)
+    _local.span = span
+    try:
+        yield span
+    finally:
+        _local.span = previous
+
+
+def profiled(method):
+    """
+    Decorates LinkedInApplication endpoints so that each call is recorded as
+    a span when the application's profiler is enabled. Objects without a
+    ``profiler`` are never profiled.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        profiler = getattr(self, 'profiler', None)
+        if profiler is None or not profiler.enabled or current_span() is not None:
+            return method(self, *args, **kwargs)
+        span = CallSpan(profiler, method.__name__)
+        _local.span = span
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            _local.span = None
+            profiler.record(span, timer())
+    # functools.wraps only sets this on Python 3.
+    wrapper.__wrapped__ = method
+    return wrapper
+
+
+class Profiler(object):
+    """
+    Records per-call phase timings of LinkedInApplication endpoints and
+    aggregates them per endpoint. Profiling can be switched on and off at any
+    time through ``enabled``; when it is off an endpoint call costs a single
+    attribute check.
+
+    The phases are: ``selector`` (LinkedInSelector.parse), ``queue``
+    (waiting in a RequestScheduler), ``sign`` (preparing and signing the
+    request), ``network``, ``raise_for_error``, ``decode`` (JSON decoding)
+    and ``other``, the time none of them accounts for, such as building the
+    URL, circuit breaker checks and the local store.
+    """
+
+    def __init__(self, enabled=False, max_events=100000):
+        self.enabled = enabled
+        self._stats = collections.defaultdict(lambda: collections.defaultdict(
+            lambda: [0, 0.0, 0.0]))
+        self._events = collections.deque(maxlen=max_events)
+        self._lock = threading.Lock()
+        self._epoch = timer()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._events.clear()
+
+    def record(self, span, end):
+        span.end = end
+        total = end - span.start
+        other = max(total - span.accounted(), 0.0)
+        with self._lock:
+            stats = self._stats[span.endpoint]
+            for phase, _, duration in span.phases + [('other', span.start, other),
+                                                     ('total', span.start, total)]:
+                entry = stats[phase]
+                entry[0] += 1
+                entry[1] += duration
+                entry[2] = max(entry[2], duration)
+            self._events.append(span)
+
+    def stats(self):
+        """
+        Returns ``{endpoint: {phase: {'count', 'total', 'mean', 'max'}}}``
+        with durations in seconds.
+        """
+        with self._lock:
+            return dict((endpoint, dict(
+                (phase, {'count': count, 'total': total,
+                         'mean': total / count if count else 0.0, 'max': maximum})
+                for phase, (count, total, maximum) in phases.items()))
+                for endpoint, phases in self._stats.items())
+
+    def report(self):
+        """
+        Returns the aggregated timings as a text table, in milliseconds.
+        """
+        lines = ['%-28s %-16s %8s %10s %10s %10s' % ('endpoint', 'phase', 'calls',
+                                                   'total ms', 'mean ms', 'max ms')]
+        for endpoint, phases in sorted(self.stats().items()):
+            for phase in PHASES + ('total',):
+                if phase not in phases:
+                    continue
+                entry = phases[phase]
+                lines.append('%-28s %-16s %8d %10.2f %10.3f %10.3f' % (
+                    endpoint, phase, entry['count'], entry['total'] * 1000,
+                    entry['mean'] * 1000, entry['max'] * 1000))
+        return '\n'.join(lines)
+
+    def trace_events(self):
+        """
+        Returns the recorded calls in the Trace Event Format understood by
+        chrome://tracing and Perfetto.
+        """
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self._events)
+        events = []
+        for span in spans:
+            for name, start, duration in [(span.endpoint, span.start,
+                                           span.end - span.start)] + span.phases:
+                events.append({'name': name, 'cat': span.endpoint, 'ph': 'X',
+                               'ts': (start - self._epoch) * 1e6,
+                               'dur': duration * 1e6,
+                               'pid': pid, 'tid': span.thread_id})
+        return events
+
+    def dump_trace(self, fileobj):
+        """
+        Writes a trace file loadable in standard trace viewers. ``fileobj``
+        is a path or a file opened for writing text.
+        """
+        if not hasattr(fileobj, 'write'):
+            with open(fileobj, 'w') as f:
+                return self.dump_trace(f)
+        json.dump({'traceEvents': self.trace_events(),
+                   'displayTimeUnit': 'ms'}, fileobj)
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+import collections
+import hashlib
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+try:
+    from urllib3.exceptions import ConnectTimeoutError
+except ImportError:
+    from requests.packages.urllib3.exceptions import ConnectTimeoutError
+
+from .exceptions import LinkedInError, get_exception_for_error_code
+from .linkedin import ENDPOINTS
+from .models import LinkedInShare, LinkedInGroupPost
+from .scheduler import TokenBucket
+from .utils import enum, json, raise_for_error
+
+
+__all__ = ['BulkPublisher', 'PublishResult', 'MemoryIdempotencyStore',
+           'PUBLISH_STATUS']
+
+PUBLISH_STATUS = enum('PublishStatus', PUBLISHED='published', DUPLICATE='duplicate',
+                      INVALID='invalid', FAILED='failed', UNKNOWN='unknown')
+
+PublishResult = collections.namedtuple('PublishResult', [
+    'index', 'spec', 'idempotency_key', 'status', 'response', 'error'])
+
+PreparedPost = collections.namedtuple('PreparedPost', [
+    'index', 'spec', 'url', 'body', 'idempotency_key', 'returns_json'])
+
+SHARE_FIELDS = ('comment', 'title', 'description', 'submitted_url',
+                'submitted_image_url', 'visibility_code')
+GROUP_POST_FIELDS = ('title', 'summary', 'submitted_url', 'submitted_image_url',
+                     'content_title', 'description')
+
+
+def _not_sent(error):
+    """
+    Tells whether a request failed while connecting, before anything was
+    sent; only then can a post be retried without risking a duplicate.
+    """
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if isinstance(error, requests.ConnectionError) and error.args:
+        # urllib3 reports refused and unreachable connections as
+        # NewConnectionError, a subclass of ConnectTimeoutError.
+        return isinstance(getattr(error.args[0], 'reason', None), ConnectTimeoutError)
+    return False
+
+
+class MemoryIdempotencyStore(object):
+    """
+    Remembers which idempotency keys have been published. Replace it with a
+    persistent implementation to survive restarts; ``claim`` must be atomic.
+    """
+
+    def __init__(self):
+        self._published = {}
+        self._in_flight = set()
+        self._lock = threading.Lock()
+
+    def claim(self, key):
+        """
+        Returns True if the caller may publish ``key``.
+        """
+        with self._lock:
+            if key in self._published or key in self._in_flight:
+                return False
+            self._in_flight.add(key)
+            return True
+
+    def get(self, key):
+        with self._lock:
+            return self._published.get(key)
+
+    def complete(self, key, response):
+        with self._lock:
+            self._in_flight.discard(key)
+            self._published[key] = response
+
+    def release(self, key):
+        with self._lock:
+            self._in_flight.discard(key)
+
+
+class BulkPublisher(object):
+    """
+    Publishes a stream of member shares, company shares and group posts.
+
+    Every spec is a dict with a ``kind`` of ``share``, ``company_share`` or
+    ``group_post``, the target (``company_id`` or ``group_id``) and the
+    keyword arguments of the matching ``LinkedInApplication.submit_*``
+    method. Specs are validated and serialized before anything is sent, at
+    most ``max_workers`` posts are in flight and at most ``rate`` posts are
+    sent per second. Each spec is published once per idempotency key
+    (``idempotency_key`` in the spec, or a digest of the target and payload),
+    so retried runs do not post twice. The keys are only known to the
+    idempotency store; LinkedIn has no way to deduplicate posts, so only
+    requests that failed while connecting are retried, after an exponential
+    backoff starting at ``backoff`` seconds. Server errors and timeouts may
+    have published the post; they are reported as UNKNOWN without a retry
+    and their key stays claimed, so a re-run reports them as duplicates.
+    Once you know the post does not exist, ``release`` its key in the
+    idempotency store to publish it again.
+
+    Usage:
+        publisher = BulkPublisher(application, max_workers=8, rate=2)
+        for result in publisher.publish(specs):
+            print(result.index, result.status)
+    """
+
+    def __init__(self, application, max_workers=8, rate=None, burst=None,
+                 idempotency_store=None, retries=2, backoff=0.5):
+        self.application = application
+        self.max_workers = max_workers
+        self.throttle = TokenBucket(rate, burst) if rate else None
+        self.idempotency_store = idempotency_store or MemoryIdempotencyStore()
+        self.retries = retries
+        self.backoff = backoff
+
+    def prepare(self, spec, index=None):
+        """
+        Validates a spec and returns a PreparedPost with the serialized body.
+        Raises ValueError for invalid specs.
+        """
+        options = dict(spec)
+        kind = options.pop('kind', None)
+        key = options.pop('idempotency_key', None)
+        returns_json = True
+        if kind == 'group_post':
+            group_id = options.pop('group_id', None)
+            if group_id is None:
+                raise ValueError('group_post requires group_id')
+            self._check_fields(kind, options, GROUP_POST_FIELDS,
+                               required=('title', 'summary', 'submitted_url',
+                                         'content_title'))
+            post = LinkedInGroupPost(*[options.get(f) for f in GROUP_POST_FIELDS])
+            url = '%s/%s/posts' % (ENDPOINTS.GROUPS, group_id)
+            returns_json = False
+        elif kind in ('share', 'company_share'):
+            if kind == 'company_share':
+                company_id = options.pop('company_id', None)
+                if company_id is None:
+                    raise ValueError('company_share requires company_id')
+                url = '%s/%s/shares' % (ENDPOINTS.COMPANIES, company_id)
+            else:
+                url = '%s/~/shares' % ENDPOINTS.PEOPLE
+            self._check_fields(kind, options, SHARE_FIELDS)
+            if options.get('comment') is None and not (
+                    options.get('title') and options.get('submitted_url')):
+                raise ValueError('%s requires a comment or a title and submitted_url' % kind)
+            options.setdefault('visibility_code', 'anyone')
+            post = LinkedInShare(*[options.get(f) for f in SHARE_FIELDS])
+        else:
+            raise ValueError('Unknown kind: %r' % kind)
+
+        body = json.dumps(post.json, sort_keys=True).encode('utf8')
+        if key is None:
+            key = hashlib.sha1(url.encode('utf8') + b'\n' + body).hexdigest()
+        return PreparedPost(index, spec, url, body, key, returns_json)
+
+    def _check_fields(self, kind, options, fields, required=()):
+        unknown = set(options) - set(fields)
+        if unknown:
+            raise ValueError('Unknown fields for %s: %s' % (kind, ', '.join(sorted(unknown))))
+        missing = [f for f in required if not options.get(f)]
+        if missing:
+            raise ValueError('%s requires %s' % (kind, ', '.join(missing)))
+
+    def publish(self, specs):
+        """
+        Publishes the specs and yields a PublishResult for each of them as
+        soon as it is done, so results are not necessarily in input order.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = set()
+            for index, spec in enumerate(specs):
+                try:
+                    prepared = self.prepare(spec, index)
+                except ValueError as error:
+                    yield PublishResult(index, spec, None, PUBLISH_STATUS.INVALID,
+                                        None, error)
+                    continue
+                pending.add(executor.submit(self._publish_one, prepared))
+                # Keep a bounded number of posts queued so that the input
+                # stream is consumed lazily.
+                while len(pending) >= self.max_workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+    def _publish_one(self, prepared):
+        key = prepared.idempotency_key
+        store = self.idempotency_store
+        if not store.claim(key):
+            return PublishResult(prepared.index, prepared.spec, key,
+                                 PUBLISH_STATUS.DUPLICATE, store.get(key), None)
+        attempt = 0
+        while True:
+            response = None
+            try:
+                if self.throttle is not None:
+                    self.throttle.consume()
+                response = self.application.make_request('POST', prepared.url,
+                                                         data=prepared.body)
+                raise_for_error(response)
+                if response.status_code >= 400:
+                    # raise_for_error lets errors with an empty body through.
+                    raise get_exception_for_error_code(response.status_code)(
+                        'HTTP %d with an empty body' % response.status_code)
+            except requests.ConnectionError as error:
+                if not _not_sent(error):
+                    return self._unknown(prepared, error)
+                attempt += 1
+                if attempt <= self.retries:
+                    time.sleep(self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+                    continue
+                return self._failed(prepared, error)
+            except requests.RequestException as error:
+                # E.g. a read timeout; the post may have been published.
+                return self._unknown(prepared, error)
+            except LinkedInError as error:
+                if response is None or response.status_code < 500:
+                    # Rejected before it was sent, or refused by LinkedIn.
+                    return self._failed(prepared, error)
+                return self._unknown(prepared, error)
+            result = True
+            if prepared.returns_json:
+                try:
+                    result = response.json()
+                except ValueError:
+                    # Published all the same.
+                    result = None
+            store.complete(key, result)
+            return PublishResult(prepared.index, prepared.spec, key,
+                                 PUBLISH_STATUS.PUBLISHED, result, None)
+
+    def _failed(self, prepared, error):
+        self.idempotency_store.release(prepared.idempotency_key)
+        return PublishResult(prepared.index, prepared.spec, prepared.idempotency_key,
+                             PUBLISH_STATUS.FAILED, None, error)
+
+    def _unknown(self, prepared, error):
+        # The key stays claimed so that a re-run does not post twice.
+        return PublishResult(prepared.index, prepared.spec, prepared.idempotency_key,
+                             PUBLISH_STATUS.UNKNOWN, None, error)
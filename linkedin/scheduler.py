@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+import collections
+import threading
+import time
+
+from .exceptions import LinkedInDeadlineExceededError
+
+
+__all__ = ['RequestScheduler', 'TokenBucket', 'DEFAULT_LANES']
+
+# Lane name -> weight. Backlogged lanes are dispatched in proportion to their
+# weights.
+DEFAULT_LANES = {'interactive': 8, 'bulk': 1}
+
+
+class TokenBucket(object):
+    """
+    Allows ``rate`` operations per second on average with bursts of up to
+    ``capacity`` operations.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.time):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.capacity,
+                           self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_consume(self, amount=1):
+        """
+        Takes ``amount`` tokens if available; otherwise returns the number of
+        seconds until they will be.
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return 0
+            return (amount - self._tokens) / self.rate
+
+    def consume(self, amount=1, timeout=None):
+        """
+        Blocks until ``amount`` tokens are taken and returns True, or returns
+        False if that would take longer than ``timeout`` seconds.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            wait = self.try_consume(amount)
+            if not wait:
+                return True
+            if deadline is not None and time.time() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class _Job(object):
+    def __init__(self, func, deadline):
+        self.func = func
+        self.deadline = deadline
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _Lane(object):
+    def __init__(self, name, weight):
+        self.name = name
+        self.weight = float(weight)
+        self.jobs = collections.deque()
+        self.vtime = 0.0
+
+
+class RequestScheduler(object):
+    """
+    Runs API requests on a fixed set of ``workers`` threads, sized like the
+    connection pool, and shares them between priority lanes.
+
+    Whenever a worker is free it takes the next request of the backlogged
+    lane with the lowest virtual time; a lane's virtual time advances by
+    ``1 / weight`` per dispatched request, so lanes are served in proportion
+    to their weights and a busy bulk lane can not starve interactive calls.
+    With ``rate`` set the lanes also share a token bucket of that many
+    requests per second. Requests whose deadline passes before they are
+    sent are dropped with LinkedInDeadlineExceededError.
+    """
+
+    def __init__(self, lanes=None, workers=10, rate=None, burst=None,
+                 default_lane='bulk'):
+        lanes = lanes or DEFAULT_LANES
+        self.lanes = dict((name, _Lane(name, weight))
+                          for name, weight in lanes.items())
+        assert default_lane in self.lanes, 'Unknown default lane %s' % default_lane
+        self.default_lane = default_lane
+        self.throttle = TokenBucket(rate, burst) if rate else None
+        self.dropped = collections.defaultdict(int)
+        self.dispatched = collections.defaultdict(int)
+        self._vtime = 0.0
+        self._condition = threading.Condition()
+        self._local = threading.local()
+        self._stopped = False
+        self._workers = []
+        for i in range(workers):
+            worker = threading.Thread(target=self._work,
+                                      name='linkedin-scheduler-%d' % i)
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    @property
+    def in_worker(self):
+        return getattr(self._local, 'worker', False)
+
+    def queued(self, lane=None):
+        with self._condition:
+            if lane is not None:
+                return len(self.lanes[lane].jobs)
+            return sum(len(l.jobs) for l in self.lanes.values())
+
+    def submit(self, func, lane=None, deadline=None):
+        """
+        Queues ``func`` on a lane, blocks until it has run and returns its
+        result. ``deadline`` is an absolute time.time() value.
+        """
+        lane = self.lanes[lane or self.default_lane]
+        if deadline is not None and deadline <= time.time():
+            self.dropped[lane.name] += 1
+            raise LinkedInDeadlineExceededError('Deadline passed before the request was queued')
+        job = _Job(func, deadline)
+        with self._condition:
+            if not lane.jobs:
+                # An idle lane must not bank credit while it has nothing to do.
+                lane.vtime = max(lane.vtime, self._vtime)
+            lane.jobs.append(job)
+            self._condition.notify()
+        job.done.wait()
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def _next_job(self):
+        with self._condition:
+            while True:
+                if self._stopped:
+                    return None, None
+                backlogged = [l for l in self.lanes.values() if l.jobs]
+                if backlogged:
+                    lane = min(backlogged, key=lambda l: l.vtime)
+                    self._vtime = lane.vtime
+                    lane.vtime += 1.0 / lane.weight
+                    return lane, lane.jobs.popleft()
+                self._condition.wait()
+
+    def _work(self):
+        self._local.worker = True
+        while True:
+            lane, job = self._next_job()
+            if job is None:
+                return
+            timeout = None
+            if job.deadline is not None:
+                timeout = job.deadline - time.time()
+                if timeout <= 0:
+                    self._drop(lane, job)
+                    continue
+            if self.throttle is not None and not self.throttle.consume(timeout=timeout):
+                self._drop(lane, job)
+                continue
+            self.dispatched[lane.name] += 1
+            try:
+                job.result = job.func()
+            except BaseException as error:
+                job.error = error
+                if not isinstance(error, Exception):
+                    # The submitter is woken up with it; the worker exits.
+                    raise
+            finally:
+                job.done.set()
+
+    def _drop(self, lane, job):
+        self.dropped[lane.name] += 1
+        job.error = LinkedInDeadlineExceededError(
+            'Deadline passed while queued in the %s lane' % lane.name)
+        job.done.set()
+
+    def shutdown(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+            for lane in self.lanes.values():
+                while lane.jobs:
+                    job = lane.jobs.popleft()
+                    job.error = LinkedInDeadlineExceededError('Scheduler was shut down')
+                    job.done.set()
+        for worker in self._workers:
+            worker.join()
@@ -1,40 +1,299 @@
-# -*- coding: utf-8 -*-
-import BaseHTTPServer
-import urlparse
-
-from .linkedin import LinkedInApplication, LinkedInAuthentication, PERMISSIONS
-
-
-def quick_api(api_key, secret_key, port=8000):
-    """
-    This method helps you get access to linkedin api quickly when using it
-    from the interpreter.
-    Notice that this method creates http server and wait for a request, so it
-    shouldn't be used in real production code - it's just an helper for debugging
-
-    The usage is basically:
-    api = quick_api(KEY, SECRET)
-    After you do that, it will print a URL to the screen which you must go in
-    and allow the access, after you do that, the method will return with the api
-    object.
-    """
-    auth = LinkedInAuthentication(api_key, secret_key, 'http://localhost:8000/',
-                                  PERMISSIONS.enums.values())
-    app = LinkedInApplication(authentication=auth)
-    print auth.authorization_url
-    _wait_for_user_to_enter_browser(app, port)
-    return app
-
-
-def _wait_for_user_to_enter_browser(app, port):
-    class MyHandler(BaseHTTPServer.BaseHTTPRequestHandler):
-        def do_GET(self):
-            p = self.path.split('?')
-            if len(p) > 1:
-                params = urlparse.parse_qs(p[1], True, True)
-                app.authentication.authorization_code = params['code'][0]
-                app.authentication.get_access_token()
-
-    server_address = ('', port)
-    httpd = BaseHTTPServer.HTTPServer(server_address, MyHandler)
-    httpd.handle_request()
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlparse, parse_qs
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlparse, parse_qs
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .exceptions import LinkedInAuthorizationError
+from .linkedin import LinkedInApplication, LinkedInAuthentication, PERMISSIONS
+
+
+__all__ = ['quick_api', 'LinkedInAuthorizationService', 'TokenStore',
+           'MemoryTokenStore']
+
+
+def quick_api(api_key, secret_key, port=8000, timeout=300):
+    """
+    This method helps you get access to linkedin api quickly when using it
+    from the interpreter.
+    Notice that this method creates http server and wait for a request, so it
+    shouldn't be used in real production code - it's just an helper for debugging
+
+    The usage is basically:
+    api = quick_api(KEY, SECRET)
+    After you do that, it will print a URL to the screen which you must go in
+    and allow the access, after you do that, the method will return with the api
+    object. LinkedInAuthorizationError is raised if the access is denied or
+    no callback arrives within ``timeout`` seconds.
+    """
+    service = LinkedInAuthorizationService(api_key, secret_key,
+                                           'http://localhost:%d/' % port,
+                                           list(PERMISSIONS.enums.values()))
+    state = service.new_state()
+    print(service.authorization_url(state))
+    service.start(port=port)
+    try:
+        token = service.token_store.wait(state, timeout)
+    finally:
+        service.shutdown()
+    if token is None:
+        raise LinkedInAuthorizationError('No authorization callback within %s seconds' % timeout)
+    auth = service.authentication_for(state)
+    auth.token = token
+    return LinkedInApplication(authentication=auth)
+
+
+class TokenStore(object):
+    """
+    Receives the access tokens obtained by LinkedInAuthorizationService.
+    Subclass it to persist tokens in a database, cache or queue.
+    """
+
+    def save(self, state, token, context=None):
+        raise NotImplementedError
+
+    def fail(self, state, message, context=None):
+        """
+        Called instead of ``save`` when the sign-in for a state failed.
+        """
+        pass
+
+
+class MemoryTokenStore(TokenStore):
+    """
+    Keeps tokens and failures in memory until a caller collects them with
+    ``get`` or ``wait``. Entries nobody collects are dropped after ``ttl``
+    seconds.
+    """
+
+    def __init__(self, ttl=600, clock=time.time):
+        self.ttl = ttl
+        self.clock = clock
+        self._tokens = {}
+        self._failures = {}
+        self._condition = threading.Condition()
+
+    def __len__(self):
+        with self._condition:
+            return len(self._tokens) + len(self._failures)
+
+    def save(self, state, token, context=None):
+        with self._condition:
+            self._prune()
+            self._tokens[state] = (token, self.clock())
+            self._condition.notify_all()
+
+    def fail(self, state, message, context=None):
+        with self._condition:
+            self._prune()
+            self._failures[state] = (message, self.clock())
+            self._condition.notify_all()
+
+    def _prune(self):
+        if self.ttl is None:
+            return
+        oldest = self.clock() - self.ttl
+        for entries in (self._tokens, self._failures):
+            for state, (_, saved_at) in list(entries.items()):
+                if saved_at < oldest:
+                    del entries[state]
+
+    def get(self, state):
+        """
+        Returns and forgets the token for the given state, or None.
+        """
+        with self._condition:
+            return self._tokens.pop(state, (None, None))[0]
+
+    def wait(self, state, timeout=None):
+        """
+        Blocks until a token for the given state arrives and returns it, or
+        returns None if the timeout expires first. Raises
+        LinkedInAuthorizationError if the sign-in failed. Either way the
+        state is forgotten.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while state not in self._tokens:
+                if state in self._failures:
+                    raise LinkedInAuthorizationError(self._failures.pop(state)[0])
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+            return self._tokens.pop(state)[0]
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    request_queue_size = 512
+
+
+class LinkedInAuthorizationService(object):
+    """
+    An embeddable OAuth 2.0 callback service that can onboard many members at
+    once. Every sign-in gets its own single-use ``state``; callbacks are
+    served concurrently and the authorization codes are exchanged for access
+    tokens over a shared connection pool. Tokens are handed to ``token_store``.
+
+    Usage:
+        service = LinkedInAuthorizationService(KEY, SECRET, 'http://localhost:8000/')
+        service.start(port=8000)
+        state = service.new_state(context={'user': 42})
+        redirect_user_to(service.authorization_url(state))
+    """
+
+    def __init__(self, key, secret, redirect_uri, permissions=None,
+                 token_store=None, state_ttl=600, timeout=10, pool_size=100,
+                 max_exchanges=None):
+        self.key = key
+        self.secret = secret
+        self.redirect_uri = redirect_uri
+        self.permissions = permissions or []
+        self.token_store = token_store or MemoryTokenStore()
+        self.state_ttl = state_ttl
+        self.timeout = timeout
+        self.callback_path = urlparse(redirect_uri).path or '/'
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._exchanges = threading.BoundedSemaphore(max_exchanges or pool_size)
+
+        self._states = {}
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+
+    def authentication_for(self, state=None):
+        auth = LinkedInAuthentication(self.key, self.secret, self.redirect_uri,
+                                      self.permissions, session=self.session)
+        auth.state = state
+        return auth
+
+    def new_state(self, context=None):
+        """
+        Generates and tracks a new state value; ``context`` is passed to the
+        token store along with the token once the member signs in.
+        """
+        state = self.authentication_for()._make_new_state()
+        now = time.time()
+        with self._lock:
+            self._expire_states(now)
+            self._states[state] = (now + self.state_ttl, context)
+        return state
+
+    def authorization_url(self, state=None):
+        return self.authentication_for(state or self.new_state()).authorization_url
+
+    @property
+    def pending(self):
+        with self._lock:
+            return len(self._states)
+
+    def _expire_states(self, now):
+        expired = [s for s, (expires_at, _) in self._states.items()
+                   if expires_at <= now]
+        for state in expired:
+            del self._states[state]
+
+    def _consume_state(self, state):
+        with self._lock:
+            known = state in self._states
+            expires_at, context = self._states.pop(state, (0, None))
+        return known, expires_at > time.time(), context
+
+    def handle_callback(self, query):
+        """
+        Processes the query string LinkedIn redirected the member back with
+        and returns an ``(http_status, message)`` tuple. Failed sign-ins of
+        known states are reported to ``token_store.fail``.
+        """
+        params = parse_qs(query, True)
+        state = params.get('state', [None])[0]
+        known, valid, context = self._consume_state(state)
+        if not valid:
+            status, message = 400, 'Unknown or expired state.'
+        elif 'error' in params:
+            status, message = 400, 'Authorization failed: %s' % params.get(
+                'error_description', params['error'])[0]
+        elif not params.get('code', [None])[0]:
+            status, message = 400, 'Missing authorization code.'
+        else:
+            auth = self.authentication_for(state)
+            auth.authorization_code = params['code'][0]
+            try:
+                with self._exchanges:
+                    token = auth.get_access_token(timeout=self.timeout)
+            except Exception:
+                status, message = 502, 'Could not obtain an access token.'
+            else:
+                self.token_store.save(state, token, context)
+                return 200, 'You have signed in, you can now close this window.'
+        if known:
+            self.token_store.fail(state, message, context)
+        return status, message
+
+    def _make_handler(self):
+        service = self
+
+        class CallbackHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                if parsed.path != service.callback_path:
+                    status, message = 404, 'Not found.'
+                else:
+                    try:
+                        status, message = service.handle_callback(parsed.query)
+                    except Exception:
+                        status, message = 500, 'Could not process the callback.'
+                body = message.encode('utf8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/plain; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return CallbackHandler
+
+    def serve_forever(self, host='', port=8000):
+        self._httpd = _ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.serve_forever()
+
+    def start(self, host='', port=8000):
+        """
+        Starts serving callbacks on a background thread.
+        """
+        self._httpd = _ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread = threading.Thread(target=self._httpd.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    @property
+    def server_address(self):
+        return self._httpd.server_address if self._httpd else None
+
+    def shutdown(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
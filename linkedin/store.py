@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+import collections
+import re
+import threading
+import time
+
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+
+
+__all__ = ['LocalStore', 'StoredRecord', 'INDEXED_FIELDS']
+
+StoredRecord = collections.namedtuple('StoredRecord', ['kind', 'id', 'fields', 'fetched_at'])
+
+# Logical endpoint -> kind of the records it returns.
+KINDS = {'people': 'people', 'people-search': 'people',
+         'companies': 'companies', 'company-search': 'companies',
+         'jobs': 'jobs', 'job-search': 'jobs'}
+
+# Sub-resources whose members are records of the parent kind.
+RECORD_SUBRESOURCES = {'people': frozenset(['connections'])}
+
+# Kind -> index -> dotted paths of the fields feeding it. Lists and
+# ``values`` collections along a path are walked into.
+INDEXED_FIELDS = {
+    'people': {
+        'industry': ['industry'],
+        'location': ['location.name'],
+        'company': ['positions.values.company.name',
+                    'threeCurrentPositions.values.company.name'],
+        'title': ['headline', 'positions.values.title',
+                  'threeCurrentPositions.values.title'],
+    },
+    'companies': {
+        'industry': ['industry', 'industries.values.name'],
+        'location': ['locations.values.address.city'],
+        'company': ['name', 'universalName'],
+        'title': ['name', 'specialties.values'],
+    },
+    'jobs': {
+        'industry': ['position.industries.values.name'],
+        'location': ['position.location.name', 'locationDescription'],
+        'company': ['company.name'],
+        'title': ['position.title'],
+    },
+}
+
+# Indexes matched word by word; the others are matched on the whole value.
+KEYWORD_INDEXES = frozenset(['title'])
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def _resource(url):
+    """
+    Returns the path segments of an API URL without selectors, e.g.
+    ``['people', '~', 'connections']`` for
+    https://api.linkedin.com/v1/people/~/connections:(id,headline).
+    """
+    path = urlparse(url).path
+    if path.startswith('/v1/'):
+        path = path[4:]
+    plain = []
+    depth = 0
+    for i, char in enumerate(path):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif depth == 0 and not (char == ':' and path[i + 1:i + 2] in ('(', ':')):
+            plain.append(char)
+    return [segment for segment in ''.join(plain).split('/') if segment]
+
+
+def _walk(data, path):
+    if isinstance(data, list):
+        for item in data:
+            for value in _walk(item, path):
+                yield value
+        return
+    if not path:
+        if data is not None and not isinstance(data, dict):
+            yield data
+        return
+    if isinstance(data, dict):
+        for value in _walk(data.get(path[0]), path[1:]):
+            yield value
+
+
+def _terms(index, value):
+    value = u'%s' % value
+    if index in KEYWORD_INDEXES:
+        return _WORD.findall(value.lower())
+    value = value.strip().lower()
+    return [value] if value else []
+
+
+class LocalStore(object):
+    """
+    Keeps the profiles, companies and jobs fetched by a LinkedInApplication
+    keyed by id, with the fields the selectors asked for, and indexes them
+    by industry, location, company and title keywords.
+
+    Records are fresh for ``max_age`` seconds (a number, or a dict mapping
+    ``people``, ``companies`` and ``jobs`` to numbers; None never expires).
+    A search repeated while all of its records are fresh is answered from
+    the store without calling the API, and ``search`` filters the fresh
+    records locally, e.g. to narrow down candidates before a fetch. Search
+    results depend on the member's network, so share a store only between
+    applications acting for the same member. At most ``max_searches``
+    searches are remembered, least recently used first out.
+
+    Usage:
+        store = LocalStore(max_age=6 * 3600)
+        application = LinkedInApplication(token=TOKEN, store=store)
+        application.search_job(selectors=[{'jobs': ['id', 'position']}],
+                                params={'keywords': 'python'})
+        store.search('jobs', location='San Francisco', keywords='engineer')
+    """
+
+    def __init__(self, max_age=3600, clock=time.time, max_searches=10000):
+        self.max_age = max_age
+        self.max_searches = max_searches
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._records = dict((kind, {}) for kind in INDEXED_FIELDS)
+        self._indexes = dict((kind, dict((index, collections.defaultdict(set))
+                                         for index in fields))
+                             for kind, fields in INDEXED_FIELDS.items())
+        self._searches = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(records) for records in self._records.values())
+
+    def _max_age(self, kind, max_age=None):
+        if max_age is not None:
+            return max_age
+        if isinstance(self.max_age, dict):
+            return self.max_age.get(kind)
+        return self.max_age
+
+    def is_fresh(self, record, max_age=None):
+        max_age = self._max_age(record.kind, max_age)
+        return max_age is None or self.clock() - record.fetched_at <= max_age
+
+    def get(self, kind, record_id, max_age=None):
+        """
+        Returns the fresh StoredRecord of the given kind and id, or None.
+        """
+        with self._lock:
+            record = self._records[kind].get(str(record_id))
+        if record is not None and self.is_fresh(record, max_age):
+            return record
+        return None
+
+    def ingest(self, url, payload):
+        """
+        Stores the records of a decoded API response. ``url`` is the URL the
+        response was fetched from; responses of anything but profiles,
+        connections, companies and jobs are ignored. Returns the number of
+        records stored.
+        """
+        kind, _ = self._kind(url)
+        if kind is None:
+            return 0
+        now = self.clock()
+        count = 0
+        with self._lock:
+            for fields in self._find_records(kind, payload):
+                self._put(kind, fields, now)
+                count += 1
+        return count
+
+    def _kind(self, url):
+        segments = _resource(url)
+        if not segments:
+            return None, segments
+        kind = KINDS.get(segments[0])
+        if kind is None or len(segments) > 3:
+            return None, segments
+        if len(segments) == 3 and segments[2] not in RECORD_SUBRESOURCES.get(kind, ()):
+            return None, segments
+        return kind, segments
+
+    def _find_records(self, kind, payload):
+        if isinstance(payload, list):
+            for item in payload:
+                for record in self._find_records(kind, item):
+                    yield record
+        elif isinstance(payload, dict):
+            if 'values' in payload:
+                for record in self._find_records(kind, payload['values']):
+                    yield record
+            elif kind in payload:
+                for record in self._find_records(kind, payload[kind]):
+                    yield record
+            elif payload.get('id') is not None:
+                yield payload
+
+    def _put(self, kind, fields, now):
+        record_id = str(fields['id'])
+        records = self._records[kind]
+        previous = records.get(record_id)
+        if previous is not None:
+            self._unindex(previous)
+            fields = dict(previous.fields, **fields)
+        else:
+            fields = dict(fields)
+        record = records[record_id] = StoredRecord(kind, record_id, fields, now)
+        for index, paths in INDEXED_FIELDS[kind].items():
+            for term in self._record_terms(record, paths, index):
+                self._indexes[kind][index][term].add(record_id)
+
+    def _unindex(self, record):
+        for index, paths in INDEXED_FIELDS[record.kind].items():
+            postings = self._indexes[record.kind][index]
+            for term in self._record_terms(record, paths, index):
+                ids = postings.get(term)
+                if ids is not None:
+                    ids.discard(record.id)
+                    if not ids:
+                        del postings[term]
+
+    def _record_terms(self, record, paths, index):
+        terms = set()
+        for path in paths:
+            for value in _walk(record.fields, path.split('.')):
+                terms.update(_terms(index, value))
+        return terms
+
+    def search(self, kind, industry=None, location=None, company=None,
+               keywords=None, max_age=None, limit=None):
+        """
+        Returns the fresh records of ``kind`` matching all of the given
+        criteria, most recently fetched first. ``industry``, ``location``
+        and ``company`` match whole values case-insensitively and may be
+        lists of alternatives; every word of ``keywords`` must appear in the
+        title (headline and position titles for people).
+        """
+        criteria = []
+        for index, value in (('industry', industry), ('location', location),
+                             ('company', company)):
+            if value is None:
+                continue
+            if not isinstance(value, (list, tuple, set, frozenset)):
+                value = [value]
+            criteria.append((index, [term for v in value for term in _terms(index, v)]))
+        if keywords is not None:
+            criteria.extend(('title', [term]) for term in _terms('title', keywords))
+
+        with self._lock:
+            records = self._records[kind]
+            if criteria:
+                indexes = self._indexes[kind]
+                postings = [set().union(*[indexes[index].get(term, ()) for term in terms])
+                            for index, terms in criteria]
+                # Intersect the smallest posting sets first.
+                postings.sort(key=len)
+                matched = postings[0]
+                for ids in postings[1:]:
+                    if not matched:
+                        break
+                    matched = matched & ids
+                found = [records[record_id] for record_id in matched]
+            else:
+                found = list(records.values())
+        found = [record for record in found if self.is_fresh(record, max_age)]
+        found.sort(key=lambda record: record.fetched_at, reverse=True)
+        return found[:limit] if limit is not None else found
+
+    def remember_search(self, url, params, result):
+        """
+        Remembers which records a search returned so that repeating it can
+        be answered by ``cached_search``.
+        """
+        kind, segments = self._kind(url)
+        if kind is None or len(segments) != 1 or not isinstance(result, dict):
+            return
+        collection = result.get(kind, result)
+        if not isinstance(collection, dict):
+            return
+        members = []
+        for value in collection.get('values', []):
+            if not isinstance(value, dict) or value.get('id') is None:
+                # A member we could not store; the search can not be replayed.
+                return
+            members.append((str(value['id']), tuple(value)))
+        outer = dict((k, v) for k, v in result.items() if k != kind)
+        inner = dict((k, v) for k, v in collection.items() if k != 'values')
+        key = self._search_key(url, params)
+        with self._lock:
+            self._searches.pop(key, None)
+            self._searches[key] = (kind, collection is not result, outer, inner, members)
+            while len(self._searches) > self.max_searches:
+                self._searches.popitem(last=False)
+
+    def cached_search(self, url, params):
+        """
+        Returns the result of a remembered search rebuilt from the store, or
+        None if it was not remembered or any of its records is stale.
+        """
+        key = self._search_key(url, params)
+        with self._lock:
+            entry = self._searches.pop(key, None)
+            values = None if entry is None else self._replay(entry)
+            if values is None:
+                self.misses += 1
+                return None
+            # Most recently used searches are evicted last.
+            self._searches[key] = entry
+            self.hits += 1
+        kind, nested, outer, inner, _ = entry
+        collection = dict(inner, values=values)
+        if not nested:
+            return collection
+        return dict(outer, **{kind: collection})
+
+    def _replay(self, entry):
+        kind, _, _, _, members = entry
+        records = self._records[kind]
+        values = []
+        for record_id, fields in members:
+            record = records.get(record_id)
+            if (record is None or not self.is_fresh(record) or
+                    not set(fields) <= set(record.fields)):
+                return None
+            values.append(dict((f, record.fields[f]) for f in fields))
+        return values
+
+    def _search_key(self, url, params):
+        return url, tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+
+    def prune(self):
+        """
+        Drops the stale records, and the remembered searches that can no
+        longer be replayed, and returns how many records were dropped.
+        """
+        dropped = 0
+        with self._lock:
+            for records in self._records.values():
+                for record_id, record in list(records.items()):
+                    if not self.is_fresh(record):
+                        self._unindex(record)
+                        del records[record_id]
+                        dropped += 1
+            for key, entry in list(self._searches.items()):
+                if self._replay(entry) is None:
+                    del self._searches[key]
+        return dropped
+
+    def clear(self):
+        with self._lock:
+            for kind in INDEXED_FIELDS:
+                self._records[kind].clear()
+                for postings in self._indexes[kind].values():
+                    postings.clear()
+            self._searches.clear()
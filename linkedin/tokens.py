@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .exceptions import LinkedInTokenExpiredError
+
+
+__all__ = ['TokenManager']
+
+
+class _Refresh(object):
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class TokenManager(object):
+    """
+    Tracks the absolute expiry of access tokens and refreshes or rejects them
+    before requests go out.
+
+    Expiry is found by a background sweeper that pops a heap ordered by due
+    time, so the per-request check is a couple of dict lookups regardless of
+    how many tokens are tracked. Tokens that are within ``refresh_margin``
+    seconds of expiring are handed to ``refresh_callback(token)``, which may
+    return a new AccessToken (e.g. after re-running the authorization flow)
+    or None. Requests made while a refresh is in flight wait for up to
+    ``refresh_wait`` seconds for it; requests with expired tokens raise
+    LinkedInTokenExpiredError without being sent. Failed refreshes are
+    retried after ``refresh_retry`` seconds, doubling after every failure,
+    until the token expires.
+
+    A refreshed token is swapped for its replacement until it would have
+    expired. After that it is still known to be expired for
+    ``tombstone_ttl`` seconds, then forgotten.
+    """
+
+    def __init__(self, refresh_callback=None, refresh_margin=300,
+                 sweep_interval=30, refresh_wait=10, refresh_workers=4,
+                 refresh_retry=30, tombstone_ttl=30 * 24 * 3600, clock=time.time):
+        self.refresh_callback = refresh_callback
+        self.refresh_margin = refresh_margin
+        self.sweep_interval = sweep_interval
+        self.refresh_wait = refresh_wait
+        self.refresh_retry = refresh_retry
+        self.tombstone_ttl = tombstone_ttl
+        self.clock = clock
+        self._expires = {}
+        self._tokens = {}
+        self._replacements = {}
+        self._refreshing = {}
+        self._failures = {}
+        self._heap = []
+        # (due, access_token, expires_at) of refreshed tokens. Their
+        # replacement is dropped at their expiry, and their expiry
+        # tombstone_ttl seconds later.
+        self._retired = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers)
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def track(self, token, issued_at=None):
+        """
+        Starts tracking an AccessToken whose ``expires_in`` is relative to
+        ``issued_at``, the time.time() at which it was issued. Leaving it out
+        assumes the token has just been issued, which overstates the expiry
+        of older tokens. Tokens without an expiry are ignored.
+        """
+        if not token.expires_in:
+            return None
+        expires_at = (issued_at or self.clock()) + int(token.expires_in)
+        with self._lock:
+            self._expires[token.access_token] = expires_at
+            self._tokens[token.access_token] = token
+            heapq.heappush(self._heap, (expires_at - self.refresh_margin,
+                                        next(self._counter),
+                                        token.access_token, expires_at))
+        return expires_at
+
+    def forget(self, token):
+        access_token = getattr(token, 'access_token', token)
+        with self._lock:
+            self._expires.pop(access_token, None)
+            self._tokens.pop(access_token, None)
+            self._replacements.pop(access_token, None)
+            self._failures.pop(access_token, None)
+
+    def expires_at(self, token):
+        return self._expires.get(getattr(token, 'access_token', token))
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def check(self, token):
+        """
+        Returns the token a request should use: the given one, or its
+        replacement if it has been refreshed. Raises LinkedInTokenExpiredError
+        if the token has expired.
+        """
+        while True:
+            replacement = self._replacements.get(token.access_token)
+            if replacement is None:
+                refresh = self._refreshing.get(token.access_token)
+                if refresh is None:
+                    break
+                refresh.done.wait(self.refresh_wait)
+                replacement = self._replacements.get(token.access_token)
+                if replacement is None:
+                    break
+            token = replacement
+        expires_at = self._expires.get(token.access_token)
+        if expires_at is not None and expires_at <= self.clock():
+            raise LinkedInTokenExpiredError('Access token expired at %s' %
+                                            time.ctime(expires_at))
+        return token
+
+    def sweep(self):
+        """
+        Schedules refreshes for every token that is due. Called periodically
+        by the background sweeper; returns the number of tokens found due.
+        """
+        now = self.clock()
+        due = []
+        with self._lock:
+            while self._retired and self._retired[0][0] <= now:
+                due_at, access_token, expires_at = heapq.heappop(self._retired)
+                if access_token in self._tokens:
+                    # Tracked again since.
+                    continue
+                if due_at == expires_at:
+                    self._replacements.pop(access_token, None)
+                    heapq.heappush(self._retired, (expires_at + self.tombstone_ttl,
+                                                   access_token, expires_at))
+                elif self._expires.get(access_token) == expires_at:
+                    del self._expires[access_token]
+            while self._heap and self._heap[0][0] <= now:
+                _, _, access_token, expires_at = heapq.heappop(self._heap)
+                # Entries of forgotten, refreshed or re-tracked tokens are stale.
+                if (access_token not in self._tokens or
+                        self._expires.get(access_token) != expires_at):
+                    continue
+                if access_token in self._refreshing:
+                    continue
+                due.append((self._tokens[access_token], expires_at))
+                if self.refresh_callback is not None:
+                    self._refreshing[access_token] = _Refresh()
+        if self.refresh_callback is not None:
+            for token, expires_at in due:
+                self._executor.submit(self._refresh, token, expires_at)
+        return len(due)
+
+    def _refresh(self, token, expires_at):
+        access_token = token.access_token
+        try:
+            new_token = self.refresh_callback(token)
+        except Exception:
+            new_token = None
+        if new_token is not None:
+            self.track(new_token)
+        with self._lock:
+            if new_token is not None:
+                self._replacements[access_token] = new_token
+                self._tokens.pop(access_token, None)
+                self._failures.pop(access_token, None)
+                # The expiry stays as a tombstone so that check() keeps
+                # rejecting the old token once its replacement is dropped.
+                heapq.heappush(self._retired, (expires_at, access_token, expires_at))
+            elif self._expires.get(access_token) == expires_at:
+                failures = self._failures.get(access_token, 0) + 1
+                retry_at = self.clock() + self.refresh_retry * 2 ** (failures - 1)
+                if retry_at < expires_at:
+                    self._failures[access_token] = failures
+                    heapq.heappush(self._heap, (retry_at, next(self._counter),
+                                                access_token, expires_at))
+                else:
+                    self._failures.pop(access_token, None)
+            refresh = self._refreshing.pop(access_token)
+        refresh.done.set()
+
+    def _run(self):
+        while not self._stopped.wait(self.sweep_interval):
+            self.sweep()
+
+    def start(self):
+        """
+        Starts the background sweeper.
+        """
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._executor.shutdown(wait=False)
@@ -2,8 +2,14 @@
 import requests
 from .exceptions import LinkedInError, get_exception_for_error_code
 import sys
+import zlib
 from io import StringIO
 
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+
 try:
     import simplejson as json
 except ImportError:
@@ -12,6 +18,21 @@ except ImportError:
     except ImportError:
         import json
 
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+# urllib3 transparently decodes brotli bodies whenever one of the brotli
+# packages is importable, so only advertise it then.
+if brotli is not None:
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+else:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
 
 if sys.version_info < (3,):
     import __builtin__
@@ -52,6 +73,55 @@ def enum(enum_type='enum', base_classes=None, methods=None, **attrs):
     methods['__init__'] = __init__
     return type(to_string(enum_type), base_classes, methods)
 
+def gzip_compress(data, level=6):
+    """
+    Compresses the given body with gzip framing.
+    """
+    if not isinstance(data, bytes):
+        data = data.encode('utf8')
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def wire_length(response, length=None):
+    """
+    Returns the number of body bytes that went over the wire for a response,
+    i.e. before any content decoding, or None when it is not known. ``length``
+    is the decoded length of the body.
+    """
+    if length is None:
+        length = len(response.content or b'')
+    try:
+        read = int(response.raw.tell())
+    except (AttributeError, TypeError, ValueError):
+        read = None
+    # urllib3 does not count the bytes of chunked bodies, so a non-empty body
+    # read from zero bytes only means that the count is missing.
+    if read or not length:
+        return read or 0
+    try:
+        return int(response.headers['Content-Length'])
+    except (KeyError, TypeError, ValueError):
+        pass
+    if response.headers.get('Content-Encoding', 'identity').lower() == 'identity':
+        return length
+    return None
+
+
+def endpoint_name(url):
+    """
+    Returns the logical API endpoint a URL belongs to, e.g. ``companies`` for
+    https://api.linkedin.com/v1/companies::(1035)/updates.
+    """
+    path = urlparse(url).path
+    if path.startswith('/v1/'):
+        path = path[4:]
+    for i, char in enumerate(path):
+        if char in '/:?,':
+            return path[:i]
+    return path
+
+
 def raise_for_error(response):
     try:
         response.raise_for_status()
@@ -69,9 +139,9 @@ def raise_for_error(response):
                 ex = get_exception_for_error_code(error_code)
                 raise ex(message)
             else:
-                raise LinkedInError(error.message)
+                raise LinkedInError(str(error))
         except (ValueError, TypeError):
-            raise LinkedInError(error.message)
+            raise LinkedInError(str(error))
 
 
 HTTP_METHODS = enum('HTTPMethod', GET='GET', POST='POST',
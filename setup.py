@@ -35,6 +35,8 @@ setup(name='python-linkedin',
       url='http://ozgur.github.com/python-linkedin/',
       license='MIT',
       packages=['linkedin'],
-      install_requires=['requests>=1.1.0', 'requests-oauthlib>=0.3'],
+      install_requires=['requests>=1.1.0', 'requests-oauthlib>=0.3',
+                        'futures>=3.0; python_version < "3"'],
+      test_suite='tests',
       zip_safe=False
 )
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+import json
+
+import requests
+
+
+def make_response(status=200, payload=None, url='https://api.linkedin.com/v1/people/~',
+                  method='GET'):
+    response = requests.Response()
+    response.status_code = status
+    response.url = url
+    response.request = requests.Request(method, url).prepare()
+    response.headers['Content-Type'] = 'application/json'
+    response._content = json.dumps(payload).encode('utf8') if payload is not None else b''
+    return response
+
+
+class FakeSession(requests.Session):
+    """
+    A session that answers every request with the responses produced by
+    ``handler(method, url, **kwargs)`` instead of going to the network.
+    """
+
+    def __init__(self, handler):
+        super(FakeSession, self).__init__()
+        self.handler = handler
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        result = self.handler(method, url, **kwargs)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def send(self, prepared, **kwargs):
+        return self.request(prepared.method, prepared.url)
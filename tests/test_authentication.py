@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from linkedin.linkedin import LinkedInApplication, LinkedInAuthentication
+from linkedin.models import AccessToken
+from linkedin.profiling import Profiler
+
+from .helpers import FakeSession, make_response
+
+
+def token_endpoint(method, url, **kwargs):
+    assert method == 'POST'
+    assert kwargs['data']['code'] == 'CODE'
+    return make_response(payload={'access_token': 'TOKEN', 'expires_in': 5184000},
+                         url=url, method=method)
+
+
+class GetAccessTokenTest(unittest.TestCase):
+    def test_exchanges_the_authorization_code(self):
+        session = FakeSession(token_endpoint)
+        auth = LinkedInAuthentication('key', 'secret', 'http://localhost:8000/',
+                                      session=session)
+        auth.authorization_code = 'CODE'
+        self.assertEqual(auth.get_access_token(), AccessToken('TOKEN', 5184000))
+        self.assertEqual(len(session.calls), 1)
+
+    def test_profiled_methods_tolerate_objects_without_a_profiler(self):
+        session = FakeSession(lambda method, url, **kwargs: make_response(
+            payload={'id': 'abc'}, url=url))
+        application = LinkedInApplication(token='TOKEN', session=session,
+                                          profiler=Profiler(enabled=True))
+        del application.profiler
+        self.assertEqual(application.get_profile(), {'id': 'abc'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from linkedin.breaker import CircuitBreakerRegistry, CIRCUIT_STATES
+from linkedin.exceptions import LinkedInTokenExpiredError, LinkedInCircuitOpenError
+from linkedin.linkedin import LinkedInApplication, LinkedInAuthentication
+from linkedin.models import AccessToken
+from linkedin.tokens import TokenManager
+
+from .helpers import FakeSession, make_response
+
+
+class BreakerTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self.breakers = CircuitBreakerRegistry(min_calls=1, reset_timeout=30,
+                                               clock=lambda: self.now)
+        self.responses = []
+        self.session = FakeSession(lambda method, url, **kwargs: self.responses.pop(0))
+
+    def application(self, **kwargs):
+        return LinkedInApplication(token='TOKEN', session=self.session,
+                                   circuit_breakers=self.breakers, **kwargs)
+
+    def half_open(self, application):
+        self.responses.append(make_response(500, {'status': 500, 'message': 'down'}))
+        self.assertRaises(Exception, application.get_profile)
+        breaker = self.breakers.get('people')
+        self.assertEqual(breaker.state, CIRCUIT_STATES.OPEN)
+        self.now += 31
+        return breaker
+
+    def test_failures_before_the_send_do_not_leak_the_probe(self):
+        auth = LinkedInAuthentication('key', 'secret', 'http://localhost/')
+        auth.token = AccessToken('TOKEN', 20)
+        manager = TokenManager(clock=lambda: self.now)
+        manager.track(auth.token, issued_at=self.now)
+        application = LinkedInApplication(authentication=auth, session=self.session,
+                                          circuit_breakers=self.breakers,
+                                          token_manager=manager)
+        self.half_open(application)
+        self.assertRaises(LinkedInTokenExpiredError, application.get_profile)
+        auth.token = AccessToken('FRESH', None)
+        self.responses.append(make_response(200, {'id': 'abc'}))
+        self.assertEqual(application.get_profile(), {'id': 'abc'})
+        self.assertEqual(self.breakers.get('people').state, CIRCUIT_STATES.CLOSED)
+        manager.stop()
+
+    def test_unexpected_errors_release_the_probe(self):
+        application = self.application()
+        breaker = self.half_open(application)
+        self.responses.append(ValueError('bad response'))
+        self.assertRaises(ValueError, application.get_profile)
+        self.responses.append(make_response(200, {'id': 'abc'}))
+        self.assertEqual(application.get_profile(), {'id': 'abc'})
+        self.assertEqual(breaker.state, CIRCUIT_STATES.CLOSED)
+
+    def test_open_circuit_rejects_calls(self):
+        application = self.application()
+        self.half_open(application)
+        self.now -= 31
+        self.assertRaises(LinkedInCircuitOpenError, application.get_profile)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+import json
+import unittest
+
+import requests
+
+from linkedin.exceptions import (LinkedInError, LinkedInNotFoundError,
+                                 LinkedInTokenExpiredError,
+                                 LinkedInDeadlineExceededError)
+from linkedin.gateway import (LinkedInGateway, GatewayError, ROUTES, _Slots,
+                              status_for_exception)
+
+from .helpers import FakeSession, make_response
+
+
+def upstream(method, url, **kwargs):
+    return make_response(payload={'id': 'group'}, url=url, method=method)
+
+
+class GatewayTest(unittest.TestCase):
+    def setUp(self):
+        self.gateway = LinkedInGateway(session=FakeSession(upstream), max_workers=2)
+
+    def test_routes_know_their_required_arguments(self):
+        self.assertEqual(ROUTES['get_group'].required, ('group_id',))
+        self.assertEqual(ROUTES['get_profile'].required, ())
+
+    def test_missing_argument_is_a_bad_request(self):
+        with self.assertRaises(GatewayError) as context:
+            self.gateway.dispatch('TOKEN', 'GET', '/get_group')
+        self.assertEqual(context.exception.status, 400)
+        with self.assertRaises(GatewayError) as context:
+            self.gateway.dispatch('TOKEN', 'POST', '/join_group', '{}')
+        self.assertEqual(context.exception.status, 400)
+
+    def test_missing_argument_over_http(self):
+        self.gateway.start(host='127.0.0.1', port=0)
+        try:
+            base = 'http://127.0.0.1:%d' % self.gateway.server_address[1]
+            headers = {'Authorization': 'Bearer TOKEN'}
+            response = requests.get(base + '/get_group', headers=headers)
+            self.assertEqual(response.status_code, 400)
+            response = requests.get(base + '/get_group?group_id=1', headers=headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(json.loads(response.text), {'id': 'group'})
+        finally:
+            self.gateway.shutdown()
+
+
+class RawPassThroughTest(unittest.TestCase):
+    def setUp(self):
+        self.responses = []
+        session = FakeSession(lambda method, url, **kwargs: self.responses.pop(0))
+        self.gateway = LinkedInGateway(session=session, max_workers=2)
+
+    def test_upstream_status_is_forwarded_and_errors_are_not_cached(self):
+        self.responses.extend([make_response(500), make_response(payload={'id': 'abc'})])
+        status, payload = self.gateway.dispatch('TOKEN', 'GET', '/get_profile')
+        self.assertEqual((status, payload.body), (500, b''))
+        status, payload = self.gateway.dispatch('TOKEN', 'GET', '/get_profile')
+        self.assertEqual((status, json.loads(payload.body.decode('utf8'))), (200, {'id': 'abc'}))
+        status, _ = self.gateway.dispatch('TOKEN', 'GET', '/get_profile')
+        self.assertEqual(status, 200)
+        self.assertEqual(self.gateway.metrics.get('cache_hits'), 1)
+
+
+class StreamPagesTest(unittest.TestCase):
+    def setUp(self):
+        self.responses = []
+        self.session = FakeSession(lambda method, url, **kwargs: self.responses.pop(0))
+        self.gateway = LinkedInGateway(session=self.session, max_workers=2, page_size=2)
+
+    def page(self, values, total):
+        self.responses.append(make_response(payload={
+            'people': {'_total': total, 'values': [{'id': v} for v in values]}}))
+
+    def test_pages_are_chained(self):
+        self.page(['a', 'b'], 3)
+        self.page(['c'], 3)
+        status, chunks = self.gateway.dispatch('TOKEN', 'GET', '/search_profile?stream=1')
+        self.assertEqual(status, 200)
+        self.assertEqual(len(self.session.calls), 1)
+        body = json.loads(b''.join(chunks).decode('utf8'))
+        self.assertEqual(body, {'values': [{'id': 'a'}, {'id': 'b'}, {'id': 'c'}]})
+        self.assertEqual(len(self.session.calls), 2)
+
+    def test_first_page_errors_are_raised_by_dispatch(self):
+        self.responses.append(make_response(404, {'status': 404, 'message': 'Not found',
+                                                           'errorCode': 0}))
+        self.assertRaises(LinkedInNotFoundError, self.gateway.dispatch,
+                          'TOKEN', 'GET', '/search_profile?stream=1')
+
+    def test_non_numeric_paging_is_a_bad_request(self):
+        with self.assertRaises(GatewayError) as context:
+            self.gateway.dispatch('TOKEN', 'GET', '/search_profile?stream=1&start=x')
+        self.assertEqual(context.exception.status, 400)
+        self.assertEqual(self.session.calls, [])
+
+
+class StatusForExceptionTest(unittest.TestCase):
+    def test_subclasses_answer_like_their_parents(self):
+        self.assertEqual(status_for_exception(LinkedInNotFoundError('')), 404)
+        self.assertEqual(status_for_exception(LinkedInTokenExpiredError('')), 401)
+        self.assertEqual(status_for_exception(LinkedInDeadlineExceededError('')), 504)
+        self.assertEqual(status_for_exception(LinkedInError('')), 502)
+
+
+class SlotsTest(unittest.TestCase):
+    def test_acquire_times_out_when_full(self):
+        slots = _Slots(1)
+        self.assertTrue(slots.acquire(0))
+        self.assertFalse(slots.acquire(0.01))
+        slots.release()
+        self.assertTrue(slots.acquire(0.01))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+import re
+import threading
+import unittest
+
+from linkedin.exceptions import LinkedInForbiddenError
+from linkedin.harvester import GroupHarvester
+from linkedin.linkedin import LinkedInApplication
+
+from .helpers import FakeSession, make_response
+
+POSTS = {'1': ['p1', 'p2', 'p3'], '2': ['q1']}
+COMMENTS = {'p1': ['c1', 'c2', 'c3'], 'p2': ['c4'], 'p3': [], 'q1': ['c5']}
+
+FORBIDDEN = {'status': 403, 'message': 'Not a member', 'errorCode': 0}
+
+
+def collection(values, start, count):
+    page = values[start:start + count]
+    return {'_total': len(values), 'values': page}
+
+
+class FakeGroupsApi(object):
+    def __init__(self):
+        self.requests = []
+        self.forbidden = set()
+        self.lock = threading.Lock()
+
+    def __call__(self, method, url, **kwargs):
+        params = kwargs.get('params') or {}
+        with self.lock:
+            self.requests.append((url, params.get('start')))
+        start, count = int(params.get('start', 0)), int(params.get('count', 10))
+        match = re.search(r'/groups/(\w+)/posts(?:::\(([\w,]+)\))?', url)
+        if match:
+            group_id, batch = match.groups()
+            if group_id in self.forbidden:
+                return make_response(403, FORBIDDEN, url=url)
+            if batch:
+                values = [{'id': post_id} for post_id in batch.split(',')]
+                return make_response(payload={'_total': len(values), 'values': values},
+                                     url=url)
+            values = [{'id': post_id} for post_id in POSTS[group_id]]
+            return make_response(payload=collection(values, start, count), url=url)
+        post_id = re.search(r'/posts/(\w+)/comments', url).group(1)
+        if post_id in self.forbidden:
+            return make_response(403, FORBIDDEN, url=url)
+        values = [{'id': comment_id} for comment_id in COMMENTS[post_id]]
+        return self.comments(post_id, make_response(
+            payload=collection(values, start, count), url=url))
+
+    def comments(self, post_id, response):
+        return response
+
+
+class GroupHarvesterTest(unittest.TestCase):
+    def setUp(self):
+        self.api = FakeGroupsApi()
+        self.application = LinkedInApplication(token='TOKEN', session=FakeSession(self.api))
+        self.harvester = GroupHarvester(self.application, max_workers=4, page_size=2,
+                                        comments_page_size=2, refresh_batch_size=2)
+
+    def harvest(self, *args, **kwargs):
+        records = list(self.harvester.harvest(*args, **kwargs))
+        return dict((record.post['id'] if record.post else record.group_id, record)
+                    for record in records)
+
+    def test_pages_and_comments_are_chained(self):
+        records = self.harvest(1)
+        self.assertEqual(sorted(records), ['p1', 'p2', 'p3'])
+        self.assertEqual([c['id'] for c in records['p1'].comments], ['c1', 'c2', 'c3'])
+        self.assertEqual(records['p3'].comments, [])
+        pages = [start for url, start in self.api.requests if url.endswith('/groups/1/posts')]
+        self.assertEqual(pages, [0, 2])
+        p1 = [start for url, start in self.api.requests if '/posts/p1/comments' in url]
+        self.assertEqual(p1, [0, 2])
+
+    def test_without_comments(self):
+        records = self.harvest([1, 2], with_comments=False)
+        self.assertEqual(sorted(records), ['p1', 'p2', 'p3', 'q1'])
+        self.assertTrue(all(r.comments is None and r.error is None for r in records.values()))
+        self.assertFalse([url for url, _ in self.api.requests if 'comments' in url])
+
+    def test_comments_are_fetched_concurrently_with_the_next_page(self):
+        condition = threading.Condition()
+        state = {'in_flight': 0, 'peak': 0}
+
+        def comments(post_id, response):
+            # Hold every comment request until the three posts' requests
+            # are in flight; the third post is only on the second page.
+            with condition:
+                state['in_flight'] += 1
+                state['peak'] = max(state['peak'], state['in_flight'])
+                condition.notify_all()
+                while state['peak'] < 3:
+                    if not condition.wait(2):
+                        break
+                state['in_flight'] -= 1
+            return response
+        self.api.comments = comments
+        records = self.harvest(1)
+        self.assertEqual(len(records), 3)
+        self.assertEqual(state['peak'], 3)
+
+    def test_failures_are_yielded_as_records(self):
+        self.api.forbidden.update(['2', 'p2'])
+        records = self.harvest([1, 2])
+        self.assertIsInstance(records[2].error, LinkedInForbiddenError)
+        self.assertIsNone(records[2].post)
+        self.assertIsInstance(records['p2'].error, LinkedInForbiddenError)
+        self.assertIsNone(records['p2'].comments)
+        self.assertEqual(len(records['p1'].comments), 3)
+
+    def test_refresh_batches_the_post_ids(self):
+        records = list(self.harvester.refresh(1, ['p1', 'p2', 'p3']))
+        self.assertEqual(sorted(r.post['id'] for r in records), ['p1', 'p2', 'p3'])
+        batches = sorted(re.search(r'posts::\(([\w,]+)\)', url).group(1)
+                         for url, _ in self.api.requests)
+        self.assertEqual(batches, ['p1,p2', 'p3'])
+
+
+if __name__ == '__main__':
+    unittest.main()
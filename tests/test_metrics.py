@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import unittest
+import zlib
+
+from linkedin.linkedin import LinkedInApplication
+from linkedin.utils import gzip_compress, wire_length
+
+from .helpers import FakeSession, make_response
+
+BODY = json.dumps({'values': ['x' * 100] * 20}).encode('utf8')
+
+
+def streamed(body, **headers):
+    response = make_response()
+    response._content = False
+    response.raw = io.BytesIO(body)
+    response.headers.update(headers)
+    return response
+
+
+class RequestCompressionTest(unittest.TestCase):
+    def setUp(self):
+        self.session = FakeSession(lambda method, url, **kwargs: make_response(
+            201, {'updateKey': 'KEY'}))
+
+    def share(self, compress_threshold, comment):
+        application = LinkedInApplication(token='TOKEN', session=self.session,
+                                          compress_threshold=compress_threshold)
+        application.submit_share(comment=comment)
+        return application, self.session.calls[-1][2]
+
+    def test_large_bodies_are_gzipped(self):
+        application, kwargs = self.share(100, 'x' * 1000)
+        self.assertEqual(kwargs['headers']['Content-Encoding'], 'gzip')
+        plain = zlib.decompress(kwargs['data'], 16 + zlib.MAX_WBITS)
+        self.assertEqual(json.loads(plain.decode('utf8'))['comment'], 'x' * 1000)
+        self.assertEqual(application.metrics.get('bytes_sent'), len(kwargs['data']))
+        self.assertEqual(application.metrics.get('bytes_sent_uncompressed'), len(plain))
+        self.assertTrue(len(kwargs['data']) < len(plain))
+
+    def test_small_bodies_are_sent_as_is(self):
+        application, kwargs = self.share(100, 'short')
+        self.assertNotIn('Content-Encoding', kwargs['headers'])
+        self.assertEqual(application.metrics.get('bytes_sent'), len(kwargs['data']))
+        self.assertEqual(application.metrics.get('bytes_sent_uncompressed'),
+                         len(kwargs['data']))
+
+    def test_compression_is_off_by_default(self):
+        application, kwargs = self.share(None, 'x' * 1000)
+        self.assertNotIn('Content-Encoding', kwargs['headers'])
+
+
+class WireLengthTest(unittest.TestCase):
+    def test_counts_the_bytes_read_from_the_socket(self):
+        compressed = gzip_compress(BODY)
+        response = streamed(compressed, **{'Content-Encoding': 'gzip'})
+        response.raw.read()
+        self.assertEqual(wire_length(response, len(BODY)), len(compressed))
+
+    def test_falls_back_to_the_content_length(self):
+        response = streamed(b'', **{'Content-Encoding': 'gzip', 'Content-Length': '42'})
+        self.assertEqual(wire_length(response, len(BODY)), 42)
+
+    def test_chunked_bodies(self):
+        # Nothing counted the chunks, so the raw position stays at zero.
+        response = streamed(b'', **{'Transfer-Encoding': 'chunked'})
+        self.assertEqual(wire_length(response, len(BODY)), len(BODY))
+        response.headers['Content-Encoding'] = 'gzip'
+        self.assertEqual(wire_length(response, len(BODY)), None)
+
+    def test_empty_body(self):
+        self.assertEqual(wire_length(make_response(204)), 0)
+
+
+class ReceivedBytesTest(unittest.TestCase):
+    def fetch(self, response):
+        session = FakeSession(lambda method, url, **kwargs: response)
+        application = LinkedInApplication(token='TOKEN', session=session)
+        application.get_profile()
+        return application.metrics
+
+    def test_measured_responses(self):
+        response = make_response()
+        response._content = BODY
+        response.headers.update({'Content-Encoding': 'gzip', 'Content-Length': '300'})
+        metrics = self.fetch(response)
+        self.assertEqual(metrics.get('bytes_received'), 300)
+        self.assertEqual(metrics.get('bytes_received_uncompressed'), len(BODY))
+        self.assertEqual(metrics.compression_ratio, float(len(BODY)) / 300)
+
+    def test_unmeasured_responses_leave_the_ratio_alone(self):
+        response = make_response()
+        response._content = BODY
+        response.headers.update({'Content-Encoding': 'gzip',
+                                 'Transfer-Encoding': 'chunked'})
+        metrics = self.fetch(response)
+        self.assertEqual(metrics.get('bytes_received'), 0)
+        self.assertEqual(metrics.get('bytes_received_uncompressed'), 0)
+        self.assertEqual(metrics.get('bytes_received_unmeasured'), len(BODY))
+        self.assertEqual(metrics.compression_ratio, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from linkedin.linkedin import LinkedInApplication
+from linkedin.profiling import Profiler
+from linkedin.scheduler import RequestScheduler
+
+from .helpers import FakeSession, make_response
+
+
+class ProfilerTest(unittest.TestCase):
+    def setUp(self):
+        self.session = FakeSession(lambda method, url, **kwargs: make_response(
+            payload={'id': 'abc'}, url=url))
+        self.profiler = Profiler(enabled=True)
+
+    def application(self, **kwargs):
+        return LinkedInApplication(token='TOKEN', session=self.session,
+                                   profiler=self.profiler, **kwargs)
+
+    def test_recorded_phases(self):
+        self.application().get_profile(selectors=['id', 'headline'])
+        stats = self.profiler.stats()['get_profile']
+        self.assertEqual(sorted(stats), ['decode', 'network', 'other', 'raise_for_error',
+                                         'selector', 'sign', 'total'])
+        self.assertTrue(all(entry['count'] == 1 for entry in stats.values()))
+        phases = sum(entry['total'] for phase, entry in stats.items() if phase != 'total')
+        self.assertAlmostEqual(phases, stats['total']['total'], places=6)
+
+    def test_queue_phase_with_a_scheduler(self):
+        scheduler = RequestScheduler(workers=1)
+        try:
+            self.application(scheduler=scheduler).get_profile()
+        finally:
+            scheduler.shutdown()
+        stats = self.profiler.stats()['get_profile']
+        self.assertIn('queue', stats)
+        self.assertNotIn('selector', stats)
+
+    def test_disabled_profiler_records_nothing(self):
+        self.profiler.enabled = False
+        self.application().get_profile()
+        self.assertEqual(self.profiler.stats(), {})
+
+    def test_report_and_trace(self):
+        self.application().get_profile()
+        lines = self.profiler.report().splitlines()
+        self.assertEqual([line.split()[1] for line in lines[1:]],
+                         ['sign', 'network', 'raise_for_error', 'decode', 'other', 'total'])
+        events = self.profiler.trace_events()
+        self.assertEqual([event['name'] for event in events],
+                         ['get_profile', 'sign', 'network', 'raise_for_error', 'decode'])
+
+
+if __name__ == '__main__':
+    unittest.main()
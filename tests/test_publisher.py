@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+import requests
+try:
+    from urllib3.exceptions import MaxRetryError, NewConnectionError
+except ImportError:
+    from requests.packages.urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from linkedin.linkedin import LinkedInApplication
+from linkedin.publisher import BulkPublisher, PUBLISH_STATUS
+
+from .helpers import FakeSession, make_response
+
+SPEC = {'kind': 'share', 'comment': 'Hello'}
+
+
+def refused():
+    return requests.ConnectionError(MaxRetryError(
+        None, '/v1/people/~/shares', NewConnectionError(None, 'Connection refused')))
+
+
+class PublisherTest(unittest.TestCase):
+    def setUp(self):
+        self.responses = []
+        self.session = FakeSession(lambda method, url, **kwargs: self.responses.pop(0))
+        application = LinkedInApplication(token='TOKEN', session=self.session)
+        self.publisher = BulkPublisher(application, retries=2, backoff=0)
+
+    def publish(self, *responses, **kwargs):
+        self.responses.extend(responses)
+        calls = len(self.session.calls)
+        result = list(self.publisher.publish([kwargs.get('spec', SPEC)]))[0]
+        return result, len(self.session.calls) - calls
+
+    def test_server_errors_are_unknown_and_not_retried(self):
+        result, calls = self.publish(make_response(500, {'status': 500, 'message': 'oops'}))
+        self.assertEqual(result.status, PUBLISH_STATUS.UNKNOWN)
+        self.assertEqual(calls, 1)
+
+    def test_timeouts_are_unknown_and_not_posted_again(self):
+        result, calls = self.publish(requests.ReadTimeout('read timed out'))
+        self.assertEqual(result.status, PUBLISH_STATUS.UNKNOWN)
+        self.assertEqual(calls, 1)
+        result, calls = self.publish()
+        self.assertEqual(result.status, PUBLISH_STATUS.DUPLICATE)
+        self.assertEqual(calls, 0)
+
+    def test_empty_error_bodies_are_not_published(self):
+        spec = {'kind': 'group_post', 'group_id': 1, 'title': 't', 'summary': 's',
+                'submitted_url': 'http://example.com', 'content_title': 'c'}
+        result, _ = self.publish(make_response(503), spec=spec)
+        self.assertEqual(result.status, PUBLISH_STATUS.UNKNOWN)
+        self.assertEqual(self.publisher.idempotency_store.get(result.idempotency_key), None)
+
+    def test_client_errors_release_the_key(self):
+        result, _ = self.publish(make_response(400, {'status': 400, 'message': 'bad'}))
+        self.assertEqual(result.status, PUBLISH_STATUS.FAILED)
+        result, calls = self.publish(make_response(201, {'updateKey': 'KEY'}))
+        self.assertEqual(result.status, PUBLISH_STATUS.PUBLISHED)
+        self.assertEqual(calls, 1)
+
+    def test_refused_connections_are_retried(self):
+        result, calls = self.publish(refused(), refused(),
+                                     make_response(201, {'updateKey': 'KEY'}))
+        self.assertEqual(result.status, PUBLISH_STATUS.PUBLISHED)
+        self.assertEqual(result.response, {'updateKey': 'KEY'})
+        self.assertEqual(calls, 3)
+
+    def test_retries_are_bounded_and_release_the_key(self):
+        result, calls = self.publish(refused(), refused(), refused())
+        self.assertEqual(result.status, PUBLISH_STATUS.FAILED)
+        self.assertEqual(calls, 3)
+        result, _ = self.publish(make_response(201, {'updateKey': 'KEY'}))
+        self.assertEqual(result.status, PUBLISH_STATUS.PUBLISHED)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import unittest
+
+from linkedin.exceptions import LinkedInNotFoundError
+from linkedin.linkedin import LinkedInApplication
+from linkedin.models import RawResponse
+
+from .helpers import FakeSession, make_response
+
+PROFILE = {'id': 'abc', 'headline': 'x' * 1000}
+BODY = json.dumps(PROFILE).encode('utf8')
+
+
+class RawResponsesTest(unittest.TestCase):
+    def setUp(self):
+        self.responses = []
+        session = FakeSession(lambda method, url, **kwargs: self.responses.pop(0))
+        self.application = LinkedInApplication(token='TOKEN', session=session)
+
+    def respond(self, status=200, payload=PROFILE, **headers):
+        response = make_response(status, payload)
+        response.headers.update(headers)
+        self.responses.append(response)
+
+    def test_bytes(self):
+        self.respond(**{'Content-Encoding': 'gzip', 'Content-Length': '10'})
+        with self.application.raw_responses():
+            result = self.application.get_profile()
+        self.assertIsInstance(result, RawResponse)
+        self.assertEqual((result.status, result.body, result.length), (200, BODY, len(BODY)))
+        self.assertNotIn('Content-Encoding', result.headers)
+        self.assertNotIn('Content-Length', result.headers)
+        self.assertEqual(result.headers['Content-Type'], 'application/json')
+
+    def test_memoryview(self):
+        self.respond()
+        with self.application.raw_responses(as_memoryview=True):
+            result = self.application.get_profile()
+        self.assertIsInstance(result.body, memoryview)
+        self.assertEqual(result.body.tobytes(), BODY)
+
+    def test_sink_streaming_and_metrics(self):
+        response = make_response()
+        # A streamed response: the body is read from ``raw`` in chunks.
+        response._content = False
+        response.raw = io.BytesIO(BODY)
+        self.responses.append(response)
+        sink = io.BytesIO()
+        with self.application.raw_responses(sink=sink, chunk_size=64):
+            result = self.application.get_profile()
+        self.assertEqual(result.body, None)
+        self.assertEqual(result.length, len(BODY))
+        self.assertEqual(sink.getvalue(), BODY)
+        metrics = self.application.metrics
+        self.assertEqual(metrics.get('requests'), 1)
+        self.assertEqual(metrics.get('bytes_received'), len(BODY))
+        self.assertEqual(metrics.get('bytes_received_uncompressed'), len(BODY))
+
+    def test_errors_are_raised(self):
+        self.respond(404, {'status': 404, 'message': 'Not found', 'errorCode': 0})
+        with self.application.raw_responses():
+            self.assertRaises(LinkedInNotFoundError, self.application.get_profile)
+
+    def test_mode_ends_with_the_block(self):
+        self.respond()
+        self.respond()
+        with self.application.raw_responses():
+            self.application.get_profile()
+        self.assertEqual(self.application.get_profile(), PROFILE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+import unittest
+
+from linkedin.exceptions import LinkedInDeadlineExceededError
+from linkedin.linkedin import LinkedInApplication
+from linkedin.scheduler import RequestScheduler
+
+from .helpers import FakeSession, make_response
+
+
+class Abort(BaseException):
+    pass
+
+
+class RequestSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = RequestScheduler(workers=1)
+        self.gate = threading.Event()
+        self.threads = []
+
+    def tearDown(self):
+        self.gate.set()
+        for thread in self.threads:
+            thread.join()
+        self.scheduler.shutdown()
+
+    def spawn(self, func, *args, **kwargs):
+        thread = threading.Thread(target=func, args=args, kwargs=kwargs)
+        thread.start()
+        self.threads.append(thread)
+
+    def block_worker(self):
+        started = threading.Event()
+
+        def blocker():
+            started.set()
+            self.gate.wait()
+        self.spawn(self.scheduler.submit, blocker)
+        started.wait()
+
+    def wait_queued(self, count):
+        while self.scheduler.queued() < count:
+            time.sleep(0.001)
+
+    def test_lanes_are_served_by_weight(self):
+        self.block_worker()
+        order = []
+        for lane in ('bulk', 'interactive'):
+            for _ in range(9):
+                self.spawn(self.scheduler.submit, lambda lane=lane: order.append(lane), lane)
+        self.wait_queued(18)
+        self.gate.set()
+        for thread in self.threads:
+            thread.join()
+        # 8:1 weights: all nine interactive requests go before a third bulk one.
+        self.assertTrue(order[:10].count('interactive') >= 8, order)
+        third_bulk = [i for i, lane in enumerate(order) if lane == 'bulk'][2]
+        self.assertTrue(order[:third_bulk].count('interactive') == 9, order)
+        self.assertEqual(self.scheduler.dispatched['interactive'], 9)
+
+    def test_requests_past_their_deadline_are_dropped(self):
+        self.assertRaises(LinkedInDeadlineExceededError, self.scheduler.submit,
+                          lambda: None, 'bulk', time.time() - 1)
+        self.block_worker()
+        errors = []
+
+        def submit():
+            try:
+                self.scheduler.submit(lambda: None, 'interactive', time.time() + 0.05)
+            except LinkedInDeadlineExceededError as error:
+                errors.append(error)
+        self.spawn(submit)
+        self.wait_queued(1)
+        time.sleep(0.1)
+        self.gate.set()
+        self.threads[-1].join()
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(self.scheduler.dropped['interactive'], 1)
+        self.assertEqual(self.scheduler.dropped['bulk'], 1)
+
+    def test_errors_reach_the_submitter(self):
+        def fail():
+            raise ValueError('boom')
+        self.assertRaises(ValueError, self.scheduler.submit, fail)
+
+        def abort():
+            raise Abort()
+        # The worker goes away with it, but the submitter is still woken up.
+        self.assertRaises(Abort, self.scheduler.submit, abort)
+
+
+class ApplicationSchedulingTest(unittest.TestCase):
+    def setUp(self):
+        self.threads = []
+        self.scheduler = RequestScheduler(workers=1)
+
+        def handler(method, url, **kwargs):
+            self.threads.append(threading.current_thread().name)
+            return make_response(payload={'id': 'abc'}, url=url)
+        self.application = LinkedInApplication(token='TOKEN', session=FakeSession(handler),
+                                               scheduler=self.scheduler)
+
+    def tearDown(self):
+        self.scheduler.shutdown()
+
+    def test_requests_run_on_the_workers(self):
+        with self.application.priority('interactive'):
+            self.assertEqual(self.application.get_profile(), {'id': 'abc'})
+        self.assertEqual(self.threads, ['linkedin-scheduler-0'])
+        self.assertEqual(self.scheduler.dispatched['interactive'], 1)
+
+    def test_requests_made_on_a_worker_are_sent_inline(self):
+        # With a single worker, queueing the nested call would deadlock.
+        result = self.scheduler.submit(self.application.get_profile)
+        self.assertEqual(result, {'id': 'abc'})
+        self.assertEqual(self.threads, ['linkedin-scheduler-0'])
+        self.assertEqual(self.scheduler.dispatched['bulk'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from linkedin.linkedin import LinkedInSelector
+from linkedin.planner import SelectorPlanner
+
+
+class MergeTest(unittest.TestCase):
+    def test_union_of_fields(self):
+        self.assertEqual(LinkedInSelector.parse(LinkedInSelector.merge(
+            ['id', {'positions': ['title']}], {'positions': [{'company': 'name'}]})),
+            'id,positions:(title,company:(name))')
+
+    def test_bare_field_wins_over_sub_selection(self):
+        self.assertEqual(LinkedInSelector.merge(['positions'], {'positions': ['title']}),
+                         ['positions'])
+        self.assertEqual(LinkedInSelector.merge({'positions': ['title']}, ['positions']),
+                         ['positions'])
+
+
+class PlannerTest(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+    def get_profile(self, selectors=None):
+        self.calls.append(selectors)
+        profile = {'firstName': 'ozgur', 'lastName': 'vatansever', 'headline': 'h'}
+        if selectors:
+            profile['positions'] = {'_total': 1, 'values': [
+                {'title': 'Engineer', 'company': {'name': 'Acme'}}]}
+        return profile
+
+    def test_merges_field_lists(self):
+        planner = SelectorPlanner(self.get_profile)
+        names = planner.add(['first-name'])
+        jobs = planner.add({'positions': ['title']})
+        planner.execute()
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(dict(names.result), {'firstName': 'ozgur'})
+        self.assertEqual(jobs.result['positions']['values'][0]['title'], 'Engineer')
+
+    def test_default_fields_are_not_merged(self):
+        planner = SelectorPlanner(self.get_profile)
+        default = planner.add(None)
+        jobs = planner.add({'positions': ['title']})
+        planner.execute()
+        self.assertEqual(self.calls[0], None)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(default.result['headline'], 'h')
+        self.assertIn('positions', jobs.result)
+
+    def test_failure_resolves_every_caller(self):
+        def fail(selectors=None):
+            raise ValueError('boom')
+        planner = SelectorPlanner(fail)
+        requests = [planner.add(None), planner.add(['id'])]
+        self.assertRaises(ValueError, planner.execute)
+        for request in requests:
+            self.assertTrue(request.done)
+            self.assertRaises(ValueError, request.get)
+
+
+if __name__ == '__main__':
+    unittest.main()
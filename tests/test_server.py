@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+import requests
+
+from linkedin.exceptions import LinkedInAuthorizationError
+from linkedin.models import AccessToken
+from linkedin.server import LinkedInAuthorizationService, MemoryTokenStore
+
+from .helpers import FakeSession, make_response
+
+
+def token_endpoint(method, url, **kwargs):
+    if kwargs['data']['code'] == 'BROKEN':
+        return requests.ConnectionError('connection refused')
+    return make_response(payload={'access_token': 'TOKEN', 'expires_in': 60},
+                         url=url, method=method)
+
+
+class AuthorizationServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.service = LinkedInAuthorizationService('key', 'secret',
+                                                    'http://localhost:8000/')
+        self.service.session = FakeSession(token_endpoint)
+        self.store = self.service.token_store
+
+    def test_successful_callback_saves_the_token(self):
+        state = self.service.new_state()
+        status, _ = self.service.handle_callback('state=%s&code=CODE' % state)
+        self.assertEqual(status, 200)
+        self.assertEqual(self.store.wait(state, 1), AccessToken('TOKEN', 60))
+
+    def test_denied_consent_wakes_up_waiters(self):
+        state = self.service.new_state()
+        status, _ = self.service.handle_callback(
+            'state=%s&error=user_cancelled_authorize&error_description=denied' % state)
+        self.assertEqual(status, 400)
+        self.assertRaises(LinkedInAuthorizationError, self.store.wait, state, 1)
+
+    def test_failed_exchange_wakes_up_waiters(self):
+        state = self.service.new_state()
+        status, _ = self.service.handle_callback('state=%s&code=BROKEN' % state)
+        self.assertEqual(status, 502)
+        self.assertRaises(LinkedInAuthorizationError, self.store.wait, state, 1)
+
+    def test_expired_state_wakes_up_waiters(self):
+        self.service.state_ttl = -1
+        state = self.service.new_state()
+        status, _ = self.service.handle_callback('state=%s&code=CODE' % state)
+        self.assertEqual(status, 400)
+        self.assertRaises(LinkedInAuthorizationError, self.store.wait, state, 1)
+
+    def test_unknown_state_is_not_recorded(self):
+        status, _ = self.service.handle_callback('state=forged&code=CODE')
+        self.assertEqual(status, 400)
+        self.assertEqual(self.store._failures, {})
+
+    def test_wait_times_out(self):
+        self.assertIsNone(MemoryTokenStore().wait('state', 0.01))
+
+
+class MemoryTokenStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self.store = MemoryTokenStore(ttl=60, clock=lambda: self.now)
+
+    def test_collected_entries_are_forgotten(self):
+        self.store.save('a', AccessToken('A', 60))
+        self.store.save('b', AccessToken('B', 60))
+        self.store.fail('c', 'denied')
+        self.assertEqual(self.store.get('a'), AccessToken('A', 60))
+        self.assertIsNone(self.store.get('a'))
+        self.assertEqual(self.store.wait('b', 0), AccessToken('B', 60))
+        self.assertRaises(LinkedInAuthorizationError, self.store.wait, 'c', 0)
+        self.assertEqual(len(self.store), 0)
+
+    def test_uncollected_entries_expire(self):
+        self.store.save('a', AccessToken('A', 60))
+        self.store.fail('b', 'denied')
+        self.now += 61
+        self.store.save('c', AccessToken('C', 60))
+        self.assertEqual(len(self.store), 1)
+        self.assertIsNone(self.store.get('a'))
+        self.assertEqual(self.store.wait('b', 0), None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from linkedin.linkedin import LinkedInApplication
+from linkedin.store import LocalStore
+
+from .helpers import FakeSession, make_response
+
+API = 'https://api.linkedin.com/v1'
+SEARCH_URL = API + '/people-search:(people:(id,headline))'
+
+ADA = {'id': 'ada', 'headline': 'Python Engineer', 'industry': 'Internet',
+       'location': {'name': 'Berlin'},
+       'positions': {'values': [{'title': 'Engineer', 'company': {'name': 'Acme'}}]}}
+BOB = {'id': 'bob', 'headline': 'Sales Manager', 'industry': 'Retail',
+       'location': {'name': 'Munich'}}
+
+
+def search_result(*people):
+    return {'numResults': len(people),
+            'people': {'_total': len(people),
+                       'values': [dict((k, p[k]) for k in ('id', 'headline'))
+                                  for p in people]}}
+
+
+class LocalStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self.store = LocalStore(max_age=60, clock=lambda: self.now)
+
+    def ids(self, records):
+        return sorted(record.id for record in records)
+
+    def test_ingest(self):
+        self.assertEqual(self.store.ingest(API + '/people/~:(id,headline)', ADA), 1)
+        self.assertEqual(self.store.ingest(API + '/people/~/connections',
+                                           {'_total': 1, 'values': [BOB]}), 1)
+        self.assertEqual(self.store.ingest(SEARCH_URL, search_result(ADA, BOB)), 2)
+        # Neither records nor their collections.
+        self.assertEqual(self.store.ingest(API + '/people/~/network/updates',
+                                           {'values': [{'id': 'x'}]}), 0)
+        self.assertEqual(self.store.ingest(API + '/groups/1', {'id': '1'}), 0)
+        self.assertEqual(len(self.store), 2)
+        self.assertEqual(self.store.get('people', 'ada').fields['industry'], 'Internet')
+
+    def test_search_uses_the_indexes(self):
+        self.store.ingest(API + '/people', {'values': [ADA, BOB]})
+        self.assertEqual(self.ids(self.store.search('people', industry='internet')), ['ada'])
+        self.assertEqual(self.ids(self.store.search('people', location=['Berlin', 'Munich'])),
+                         ['ada', 'bob'])
+        self.assertEqual(self.ids(self.store.search('people', company='ACME')), ['ada'])
+        self.assertEqual(self.ids(self.store.search('people', keywords='engineer python')),
+                         ['ada'])
+        self.assertEqual(self.store.search('people', keywords='python', location='Munich'), [])
+        self.assertEqual(self.ids(self.store.search('people')), ['ada', 'bob'])
+
+    def test_search_skips_stale_records(self):
+        self.store.ingest(API + '/people', {'values': [ADA]})
+        self.now += 30
+        self.store.ingest(API + '/people', {'values': [BOB]})
+        self.assertEqual([r.id for r in self.store.search('people')], ['bob', 'ada'])
+        self.now += 31
+        self.assertEqual(self.ids(self.store.search('people')), ['bob'])
+        self.assertEqual(self.store.prune(), 1)
+        self.assertEqual(len(self.store), 1)
+
+    def test_merge_reindexes_the_record(self):
+        self.store.ingest(API + '/people', {'values': [ADA]})
+        self.store.ingest(API + '/people', {'values': [{'id': 'ada', 'headline': 'Chef'}]})
+        record = self.store.get('people', 'ada')
+        self.assertEqual(record.fields['headline'], 'Chef')
+        self.assertEqual(record.fields['industry'], 'Internet')
+        self.assertEqual(self.store.search('people', keywords='python'), [])
+        self.assertEqual(self.ids(self.store.search('people', keywords='chef')), ['ada'])
+        # Position titles are still indexed.
+        self.assertEqual(self.ids(self.store.search('people', keywords='engineer')), ['ada'])
+
+    def test_cached_search_while_fresh(self):
+        result = search_result(ADA, BOB)
+        self.store.ingest(SEARCH_URL, result)
+        self.store.remember_search(SEARCH_URL, {'keywords': 'x'}, result)
+        self.assertEqual(self.store.cached_search(SEARCH_URL, {'keywords': 'x'}), result)
+        self.assertIsNone(self.store.cached_search(SEARCH_URL, {'keywords': 'y'}))
+        self.now += 61
+        self.assertIsNone(self.store.cached_search(SEARCH_URL, {'keywords': 'x'}))
+        self.assertEqual((self.store.hits, self.store.misses), (1, 2))
+
+    def test_prune_forgets_searches_that_can_not_be_replayed(self):
+        result = search_result(ADA)
+        self.store.ingest(SEARCH_URL, result)
+        self.store.remember_search(SEARCH_URL, {}, result)
+        self.now += 61
+        self.store.prune()
+        self.assertEqual(len(self.store._searches), 0)
+
+    def test_remembered_searches_are_capped(self):
+        self.store.max_searches = 2
+        result = search_result(ADA)
+        self.store.ingest(SEARCH_URL, result)
+        for keywords in ('a', 'b'):
+            self.store.remember_search(SEARCH_URL, {'keywords': keywords}, result)
+        # Using 'a' makes 'b' the least recently used search.
+        self.assertIsNotNone(self.store.cached_search(SEARCH_URL, {'keywords': 'a'}))
+        self.store.remember_search(SEARCH_URL, {'keywords': 'c'}, result)
+        self.assertEqual(len(self.store._searches), 2)
+        self.assertIsNone(self.store.cached_search(SEARCH_URL, {'keywords': 'b'}))
+        self.assertIsNotNone(self.store.cached_search(SEARCH_URL, {'keywords': 'a'}))
+
+
+class ApplicationStoreTest(unittest.TestCase):
+    def test_repeated_search_is_answered_from_the_store(self):
+        session = FakeSession(lambda method, url, **kwargs: make_response(
+            payload=search_result(ADA, BOB), url=url))
+        store = LocalStore()
+        application = LinkedInApplication(token='TOKEN', session=session, store=store)
+        selectors = [{'people': ['id', 'headline']}]
+        first = application.search_profile(selectors=selectors, params={'keywords': 'x'})
+        second = application.search_profile(selectors=selectors, params={'keywords': 'x'})
+        self.assertEqual(first, second)
+        self.assertEqual(len(session.calls), 1)
+        self.assertEqual(len(store), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
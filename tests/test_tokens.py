@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+import time
+import unittest
+
+from linkedin.exceptions import LinkedInTokenExpiredError
+from linkedin.linkedin import LinkedInApplication, LinkedInAuthentication
+from linkedin.models import AccessToken
+from linkedin.tokens import TokenManager
+
+
+class TokenManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self.counter = 0
+        self.manager = TokenManager(refresh_callback=self.refresh, refresh_margin=10,
+                                    clock=lambda: self.now)
+
+    def tearDown(self):
+        self.manager.stop()
+
+    def refresh(self, token):
+        self.counter += 1
+        return AccessToken('token-%d' % self.counter, 100)
+
+    def test_refreshed_token_replaces_the_old_one(self):
+        old = AccessToken('old', 100)
+        self.manager.track(old, issued_at=self.now)
+        self.now += 95
+        self.assertEqual(self.manager.sweep(), 1)
+        self.assertEqual(self.manager.check(old), AccessToken('token-1', 100))
+
+    def test_replacements_are_dropped_when_the_old_token_expires(self):
+        old = AccessToken('old', 100)
+        self.manager.track(old, issued_at=self.now)
+        self.now += 95
+        self.manager.sweep()
+        self.manager.check(old)
+        self.now += 10
+        self.manager.sweep()
+        self.assertEqual(self.manager._replacements, {})
+        self.assertEqual(self.manager.check(AccessToken('token-1', 100)),
+                         AccessToken('token-1', 100))
+
+    def wait_for_refreshes(self):
+        deadline = time.time() + 5
+        while self.manager._refreshing and time.time() < deadline:
+            time.sleep(0.001)
+
+    def test_old_token_is_rejected_once_its_replacement_is_dropped(self):
+        old = AccessToken('old', 100)
+        self.manager.track(old, issued_at=self.now)
+        self.now += 95
+        self.manager.sweep()
+        self.wait_for_refreshes()
+        self.now += 10
+        self.manager.sweep()
+        self.assertRaises(LinkedInTokenExpiredError, self.manager.check, old)
+        self.now += self.manager.tombstone_ttl
+        self.manager.sweep()
+        self.assertEqual(self.manager.expires_at(old), None)
+
+    def test_failed_refreshes_are_retried_until_expiry(self):
+        results = [None, Exception('unavailable')]
+
+        def refresh(token):
+            result = results.pop(0) if results else AccessToken('new', 100)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        self.manager.refresh_callback = refresh
+        self.manager.refresh_retry = 1
+        old = AccessToken('old', 100)
+        self.manager.track(old, issued_at=self.now)
+        self.now += 90
+        for _ in range(3):
+            self.assertEqual(self.manager.sweep(), 1)
+            self.wait_for_refreshes()
+            self.now += 2
+        self.assertEqual(self.manager.check(old), AccessToken('new', 100))
+
+    def test_failed_refreshes_give_up_at_expiry(self):
+        self.manager.refresh_callback = lambda token: None
+        self.manager.refresh_retry = 4
+        old = AccessToken('old', 100)
+        self.manager.track(old, issued_at=self.now)
+        self.now += 95
+        self.manager.sweep()
+        self.wait_for_refreshes()
+        self.now += 4
+        self.assertEqual(self.manager.sweep(), 1)
+        self.wait_for_refreshes()
+        self.assertEqual(self.manager._heap, [])
+        self.assertEqual(self.manager._failures, {})
+
+    def test_expired_tokens_are_rejected(self):
+        self.manager.refresh_callback = None
+        token = AccessToken('token', 100)
+        self.manager.track(token, issued_at=self.now - 200)
+        self.assertRaises(LinkedInTokenExpiredError, self.manager.check, token)
+
+    def test_application_tracks_only_tokens_with_a_known_issue_time(self):
+        LinkedInApplication(token='plain', token_manager=self.manager)
+        auth = LinkedInAuthentication('key', 'secret', 'http://localhost/')
+        auth.token = AccessToken('unknown', 100)
+        LinkedInApplication(authentication=auth, token_manager=self.manager)
+        self.assertEqual(len(self.manager), 0)
+        auth.token, auth.token_issued_at = AccessToken('issued', 100), self.now - 50
+        LinkedInApplication(authentication=auth, token_manager=self.manager)
+        self.assertEqual(self.manager.expires_at(auth.token), self.now + 50)
+
+
+if __name__ == '__main__':
+    unittest.main()